@@ -0,0 +1,67 @@
+import os
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from async_secrets_loader import AsyncSecretsLoader
+from secrets_schema import MySQLConfig
+
+class AsyncDatabaseConnector:
+    """aiomysql pool that is rebuilt in the background when the secrets rotate."""
+
+    def __init__(self, secrets_loader, pool_size=5):
+        self.secrets_loader = secrets_loader
+        self.pool_size = pool_size
+        self.pool = None
+
+    def load_db_config(self):
+        config = self.secrets_loader.get_config(MySQLConfig)
+        return {'host': config.host, 'user': config.user, 'password': config.password,
+                'db': config.database, 'port': config.port}
+
+    async def connect_to_database(self):
+        # Open the new pool before retiring the old one; other coroutines keep
+        # using the current pool while the handshakes are in flight.
+        import aiomysql  # Imported on first connect, not at module import
+        try:
+            new_pool = await aiomysql.create_pool(minsize=1, maxsize=self.pool_size, **self.load_db_config())
+        except Exception as err:
+            logging.error(f"Database connection failed, keeping the current pool: {err}")
+            return
+        old_pool, self.pool = self.pool, new_pool
+        logging.info("Successfully connected to the database.")
+        if old_pool is not None:
+            asyncio.get_running_loop().create_task(self._drain(old_pool))
+
+    async def _drain(self, pool):
+        # close() refuses new acquires; wait_closed() waits for checked-out
+        # connections to be released.
+        pool.close()
+        await pool.wait_closed()
+
+    @asynccontextmanager
+    async def connection(self):
+        async with self.pool.acquire() as connection:
+            yield connection
+
+    async def run(self, interval=1.0):
+        await self.connect_to_database()
+        try:
+            async for snapshot in self.secrets_loader.watch(interval):
+                logging.info(f"Secrets changed (version {snapshot.version}). Reconnecting...")
+                await self.connect_to_database()
+        finally:
+            if self.pool is not None:
+                await self._drain(self.pool)
+
+async def main(secrets_dirs):
+    secrets_loader = await AsyncSecretsLoader.create(secrets_dirs, incremental=True, schemas=[MySQLConfig])
+    db_connector = AsyncDatabaseConnector(secrets_loader)
+    await db_connector.run()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    secrets_dirs = [dir.strip() for dir in os.getenv('SECRETS_DIRS', './local_secrets').split(',')]
+    try:
+        asyncio.run(main(secrets_dirs))
+    except KeyboardInterrupt:
+        logging.info("Stopping async DB connector...")
@@ -0,0 +1,116 @@
+# async_secrets_loader.py
+import asyncio
+import logging
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from secrets_loader import CredentialsSnapshot, Fingerprint, SecretsDiff, SecretsLoader, _DaemonThreadPool
+
+
+class AsyncSecretsLoader(SecretsLoader):
+    """SecretsLoader for asyncio services.
+
+    File system calls run in worker threads, so the event loop is never
+    blocked, and the files of a reload are read concurrently (at most
+    ``max_concurrency`` at a time). Construction does not load anything;
+    use ``await AsyncSecretsLoader.create(...)`` or await ``load_secrets()``.
+    ``get_credential()`` stays synchronous and lock-free.
+    """
+
+    load_on_init = False
+
+    def __init__(self, secrets_dirs: List[str], expected_keys: List[str] = [],
+                 max_concurrency: int = 32, **options):
+        super().__init__(secrets_dirs, expected_keys, **options)
+        self.max_concurrency = max_concurrency
+        self._async_reload_lock: Optional[asyncio.Lock] = None
+        self._reload_requested: Optional[asyncio.Event] = None
+
+    @classmethod
+    async def create(cls, secrets_dirs: List[str], expected_keys: List[str] = [], **options) -> 'AsyncSecretsLoader':
+        loader = cls(secrets_dirs, expected_keys, **options)
+        await loader.load_secrets()
+        loader.validate_secrets()
+        return loader
+
+    async def _call_async(self, fn, *args):
+        """Run a blocking file system call on the loader's daemon pool, bounded
+        by ``read_timeout``. The loop's default executor is never used, so a
+        hung read cannot starve ``to_thread()`` or block interpreter exit."""
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(self._read_pool.submit(fn, *args)), self.read_timeout)
+        except asyncio.TimeoutError:
+            self._pool_timed_out = True
+            raise
+
+    async def _scan_dir_async(self, scan_path: str, limit: asyncio.Semaphore) -> Dict[str, Tuple[Fingerprint, str]]:
+        async def load(secret_path):
+            async with limit:
+                try:
+                    return secret_path, await self._call_async(self._load_path, secret_path)
+                except asyncio.TimeoutError:
+                    logging.error(f"Timed out reading secret from {secret_path}, keeping the last loaded value.")
+                    self.metrics.increment('secrets.read_timeouts')
+                    return secret_path, self._last_entries.get(secret_path)
+
+        paths = await self._call_async(self._list_dir, scan_path)
+        results = await asyncio.gather(*(load(secret_path) for secret_path in paths))
+        return {secret_path: entry for secret_path, entry in results if entry is not None}
+
+    async def _load_dir_async(self, dir_path: str, limit: asyncio.Semaphore) -> Optional[Dict[str, Tuple[Fingerprint, str]]]:
+        steps = self._load_dir_steps(dir_path)
+        try:
+            fn, path = next(steps)
+            while True:
+                if fn is None:
+                    result = await self._scan_dir_async(path, limit)
+                else:
+                    result = await self._call_async(fn, path)
+                fn, path = steps.send(result)
+        except StopIteration as done:
+            return done.value
+        except asyncio.TimeoutError:
+            logging.error(f"Timed out scanning {dir_path}, keeping the last loaded secrets.")
+            self.metrics.increment('secrets.read_timeouts')
+            return self._dir_entries.get(dir_path)
+
+    async def load_secrets(self) -> SecretsDiff:
+        if self._async_reload_lock is None:
+            self._async_reload_lock = asyncio.Lock()
+        async with self._async_reload_lock:
+            self._begin_load()
+            if self._read_pool is None:
+                self._read_pool = _DaemonThreadPool(self.max_concurrency, thread_name_prefix='secrets-read')
+            limit = asyncio.Semaphore(self.max_concurrency)
+            dir_entries = await asyncio.gather(*(self._load_dir_async(dir_path, limit)
+                                                 for dir_path in self.secrets_dirs))
+            layers = await asyncio.wrap_future(self._read_pool.submit(self._load_providers)) if self.providers else []
+            if self._pool_timed_out:
+                logging.warning("Replacing the secrets thread pool after a timeout; hung calls are abandoned.")
+                self._shutdown_pools()
+            return self._commit(list(dir_entries), layers)
+
+    def request_reload(self):
+        """Wake ``watch()`` right away; call it on the loop, e.g. via ``call_soon_threadsafe``."""
+        if self._reload_requested is None:
+            self._reload_requested = asyncio.Event()
+        self._reload_requested.set()
+
+    async def watch(self, interval: float = 1.0) -> AsyncIterator[CredentialsSnapshot]:
+        """Yield a new snapshot every time a reload changes something.
+
+        Reloads happen every ``interval`` seconds, or sooner when
+        ``request_reload()`` is called. Use ``incremental=True`` so that
+        polling costs one stat per file.
+        """
+        if self._reload_requested is None:
+            self._reload_requested = asyncio.Event()
+        while True:
+            try:
+                await asyncio.wait_for(self._reload_requested.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+            self._reload_requested.clear()
+            diff = await self.load_secrets()
+            if diff:
+                self.validate_secrets()
+                yield self.get_snapshot()
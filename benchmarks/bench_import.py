@@ -0,0 +1,118 @@
+# bench_import.py
+"""Import-time benchmark for the secrets modules and connectors.
+
+Imports each module in a fresh interpreter, records the cumulative import
+time reported by ``python -X importtime`` and checks that no heavy backend
+(watchdog, mysql.connector, aiomysql, django) and no logging handler is
+pulled in at import. Prints one JSON document; with ``--check`` it exits
+non-zero when a module breaks either rule or its median exceeds ``--max-ms``:
+
+    python benchmarks/bench_import.py --repeat 10 --check --max-ms 75
+"""
+import os
+import ast
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CORE_MODULES = ['secrets_loader', 'secrets_schema', 'secrets_providers', 'secrets_socket',
+                'lazy_secrets_loader', 'reload_scheduler', 'db_pool', 'db_reconnect']
+CONNECTOR_MODULES = ['db_connect', 'multi_db_connect', 'db_connect-watchdog', 'reload_db_connect',
+                     'enhance_db_connect_secret_loader', 'env_enhance_db_connect_secret_loader',
+                     'pooled_db_connect', 'secrets_watchdog', 'async_db_connect']
+HEAVY_MODULES = ['watchdog', 'mysql', 'aiomysql', 'django', 'cryptography']
+
+# Runs in the child; prints what the import left behind on one line.
+PROBE = """
+import sys
+__import__({module!r})  # Unlike importlib, goes through the -X importtime hook
+import logging
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print('PROBE', repr((heavy, len(logging.root.handlers))))
+"""
+
+
+def probe(module):
+    """Import ``module`` in a fresh interpreter; return (microseconds, heavy modules, root handlers)."""
+    code = PROBE.format(module=module, heavy=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    cumulative = None
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if line.startswith('import time:') and line.rsplit('|', 1)[-1].strip() == module:
+            cumulative = int(line.split('|')[1])
+    heavy, handlers = ast.literal_eval(result.stdout.split('PROBE', 1)[1].strip())
+    return cumulative, heavy, handlers
+
+
+def bench_module(module, repeat):
+    samples = []
+    heavy, handlers = [], 0
+    for _ in range(repeat):
+        try:
+            cumulative, heavy, handlers = probe(module)
+        except RuntimeError as e:
+            return {'skipped': str(e)}
+        samples.append(cumulative / 1000)
+    return {
+        'median_ms': statistics.median(samples),
+        'min_ms': min(samples),
+        'heavy_imports': heavy,
+        'logging_handlers': handlers,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modules', help='comma-separated modules (default: core modules and connectors)')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--max-ms', type=float, help='with --check, fail core modules slower than this')
+    parser.add_argument('--check', action='store_true',
+                        help='exit 1 if a module imports a heavy backend, configures logging or exceeds --max-ms')
+    parser.add_argument('--output', help='write JSON here instead of stdout')
+    args = parser.parse_args(argv)
+
+    modules = args.modules.split(',') if args.modules else CORE_MODULES + CONNECTOR_MODULES
+    results = [dict(module=module, **bench_module(module, args.repeat)) for module in modules]
+
+    failures = []
+    for result in results:
+        if 'skipped' in result:
+            continue
+        if result['heavy_imports']:
+            failures.append(f"{result['module']} imports {', '.join(result['heavy_imports'])}")
+        if result['logging_handlers']:
+            failures.append(f"{result['module']} configures logging at import")
+        if args.max_ms is not None and result['module'] in CORE_MODULES and result['median_ms'] > args.max_ms:
+            failures.append(f"{result['module']} takes {result['median_ms']:.1f} ms to import")
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+        },
+        'results': results,
+        'failures': failures,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output + '\n')
+    else:
+        print(output)
+    if args.check and failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+# bench_secrets.py
+"""Benchmarks for the SecretsLoader load, reload and lookup paths.
+
+Generates synthetic secret trees in tmpfs and prints one JSON document, so
+results can be stored and compared across releases:
+
+    python benchmarks/bench_secrets.py --sizes 10,100,1000,10000 --output bench.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import threading
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from secrets_loader import SecretsLoader  # noqa: E402
+
+
+def tmpfs_root():
+    return '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+
+def write_tree(root, files, dirs, layout):
+    """Spread ``files`` secrets over ``dirs`` directories; return their paths."""
+    secrets_dirs = []
+    for d in range(dirs):
+        dir_path = os.path.join(root, f'secrets-{d}')
+        os.makedirs(dir_path)
+        target = dir_path
+        if layout == 'k8s':
+            target = os.path.join(dir_path, '..2024_01_01_00_00_00.000000001')
+            os.makedirs(target)
+            os.symlink(os.path.basename(target), os.path.join(dir_path, '..data'))
+        for i in range(d, files, dirs):
+            name = f'SECRET_{i:05d}'
+            with open(os.path.join(target, name), 'w') as file:
+                file.write(f'value-{i}-' + 'x' * 32)
+            if layout == 'k8s':
+                os.symlink(os.path.join('..data', name), os.path.join(dir_path, name))
+        secrets_dirs.append(dir_path)
+    return secrets_dirs
+
+
+def rotate(secrets_dir, layout, value):
+    """Change one secret the way the given layout would."""
+    if layout != 'k8s':
+        with open(os.path.join(secrets_dir, sorted(os.listdir(secrets_dir))[0]), 'w') as file:
+            file.write(value)
+        return
+    current = os.path.realpath(os.path.join(secrets_dir, '..data'))
+    generation = os.path.join(secrets_dir, f'..{time.time_ns()}')
+    shutil.copytree(current, generation)
+    with open(os.path.join(generation, sorted(os.listdir(generation))[0]), 'w') as file:
+        file.write(value)
+    link = os.path.join(secrets_dir, '..data_tmp')
+    os.symlink(os.path.basename(generation), link)
+    os.replace(link, os.path.join(secrets_dir, '..data'))
+    shutil.rmtree(current)
+
+
+def timings(fn, repeat, setup=None):
+    """Time ``fn`` ``repeat`` times; ``setup`` runs untimed before each sample."""
+    samples = []
+    for i in range(repeat):
+        if setup is not None:
+            setup(i)
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {'min': min(samples), 'median': statistics.median(samples), 'mean': statistics.mean(samples),
+            'repeat': repeat}
+
+
+def loader_options(layout):
+    return {'snapshot': layout == 'k8s'}
+
+
+def bench_construction(secrets_dirs, layout, repeat):
+    return timings(lambda: SecretsLoader(secrets_dirs, **loader_options(layout)), repeat)
+
+
+def bench_full_reload(secrets_dirs, layout, repeat):
+    loader = SecretsLoader(secrets_dirs, **loader_options(layout))
+
+    def new_generation(i):
+        # The k8s layout caches the files of an unchanged ..data generation,
+        # so publish a new one in every directory to time an actual re-read
+        for secrets_dir in secrets_dirs:
+            rotate(secrets_dir, layout, f'full-{i}-{time.time_ns()}')
+
+    return timings(loader.load_secrets, repeat, new_generation if layout == 'k8s' else None)
+
+
+def bench_noop_reload(secrets_dirs, layout, repeat):
+    loader = SecretsLoader(secrets_dirs, incremental=True, **loader_options(layout))
+    return timings(loader.load_secrets, repeat)
+
+
+def bench_lookup_under_reload(secrets_dirs, layout, readers, duration):
+    loader = SecretsLoader(secrets_dirs, incremental=True, **loader_options(layout))
+    keys = list(loader.credentials)[:64]
+    stop = threading.Event()
+    counts = [0] * readers
+    misses = [0] * readers
+    reloads = [0]
+
+    def read(slot):
+        get = loader.get_credential
+        n = miss = 0
+        while not stop.is_set():
+            for key in keys:
+                if get(key) is None:
+                    miss += 1
+            n += len(keys)
+        counts[slot] = n
+        misses[slot] = miss
+
+    def reload():
+        while not stop.is_set():
+            rotate(secrets_dirs[0], layout, f'rotated-{reloads[0]}')
+            loader.load_secrets()
+            reloads[0] += 1
+
+    threads = [threading.Thread(target=read, args=(slot,)) for slot in range(readers)]
+    threads.append(threading.Thread(target=reload))
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return {'readers': readers, 'duration': duration, 'lookups_per_sec': sum(counts) / duration,
+            'missing_lookups': sum(misses), 'reloads': reloads[0]}
+
+
+def bench_event_latency(secrets_dirs, layout, repeat):
+    try:
+        from watchdog.observers import Observer
+        from secrets_watchdog import SecretsUpdateHandler
+    except ImportError as e:
+        return {'skipped': f'watchdog not available: {e}'}
+    loader = SecretsLoader(secrets_dirs, incremental=True, **loader_options(layout))
+    observer = Observer()
+    observer.schedule(SecretsUpdateHandler(loader), secrets_dirs[0], recursive=True)
+    observer.start()
+    samples = []
+    try:
+        for i in range(repeat):
+            version = loader.version
+            start = time.perf_counter()
+            rotate(secrets_dirs[0], layout, f'event-{i}-{time.time_ns()}')
+            if loader.wait_for_version(version + 1, timeout=10) is None:
+                continue
+            samples.append(time.perf_counter() - start)
+    finally:
+        observer.stop()
+        observer.join()
+    if not samples:
+        return {'skipped': 'no reload observed'}
+    return {'min': min(samples), 'median': statistics.median(samples), 'mean': statistics.mean(samples),
+            'repeat': len(samples)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10,100,1000,10000', help='comma-separated file counts')
+    parser.add_argument('--dirs', type=int, default=3, help='directories to spread the files over')
+    parser.add_argument('--layouts', default='flat,k8s', help='comma-separated: flat, k8s')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--readers', type=int, default=4, help='reader threads for the lookup benchmark')
+    parser.add_argument('--duration', type=float, default=2.0, help='seconds per lookup benchmark')
+    parser.add_argument('--with-logging', action='store_true', help='log every reload, including per-file DEBUG lines')
+    parser.add_argument('--output', help='write JSON here instead of stdout')
+    args = parser.parse_args(argv)
+
+    if args.with_logging:
+        logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    results = []
+    for layout in args.layouts.split(','):
+        for files in (int(size) for size in args.sizes.split(',')):
+            root = tempfile.mkdtemp(prefix='bench-secrets-', dir=tmpfs_root())
+            try:
+                secrets_dirs = write_tree(root, files, args.dirs, layout)
+                case = {'layout': layout, 'files': files, 'dirs': args.dirs}
+                for name, result in (
+                    ('construction', bench_construction(secrets_dirs, layout, args.repeat)),
+                    ('full_reload', bench_full_reload(secrets_dirs, layout, args.repeat)),
+                    ('noop_incremental_reload', bench_noop_reload(secrets_dirs, layout, args.repeat)),
+                    ('lookup_under_reload', bench_lookup_under_reload(secrets_dirs, layout, args.readers,
+                                                                      args.duration)),
+                    ('event_to_reload', bench_event_latency(secrets_dirs, layout, args.repeat)),
+                ):
+                    results.append(dict(case, benchmark=name, **result))
+            finally:
+                shutil.rmtree(root, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'tmpfs': tmpfs_root() is not None,
+        },
+        'results': results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
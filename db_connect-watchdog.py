@@ -1,13 +1,11 @@
 import time
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
-from secrets_loader import SecretsLoader
-import mysql.connector
+from secrets_loader import SecretsLoader, redact
+from secrets_schema import MySQLConfig
+from reload_scheduler import DebouncedReloader, FileEventHandler, StaggeredCallback, stagger_policy_from_env
+from db_reconnect import ResilientConnection
 import logging
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-
-class SecretsChangeHandler(FileSystemEventHandler):
+class SecretsChangeHandler(FileEventHandler):
     def __init__(self, callback):
         self.callback = callback
 
@@ -21,40 +19,48 @@ class SecretsChangeHandler(FileSystemEventHandler):
                 logging.info(f"Detected deletion of: {event.src_path}")
                 self.callback()
 
+DB_SECRET_KEYS = ['MYSQL_HOSTNAME', 'MYSQL_USERNAME', 'MYSQL_PASSWORD', 'MYSQL_DB', 'MYSQL_PORT']
+
 class DatabaseConnector:
     def __init__(self, secrets_dirs):
-        self.secrets_loader = SecretsLoader(secrets_dirs=secrets_dirs)
+        self.secrets_loader = SecretsLoader(secrets_dirs=secrets_dirs, schemas=[MySQLConfig])
         self.db_config = None
-        self.connection = None
+        self.db = ResilientConnection()
+        self.reconnect = StaggeredCallback(self.rebuild_connection, stagger_policy_from_env())
         self.load_db_config()
         self.connect_to_database()
+        # Only a change to a database key reconnects; the token directory
+        # shares this loader and must not cause a reconnect storm
+        self.secrets_loader.register_consumer(DB_SECRET_KEYS, self.reconnect)
+        self.secrets_loader.register_consumer(['API_TOKEN'], self.on_token_changed)
 
         # After loading the secrets, access and print the API token
         #api_token = self.secrets_loader.get_credential('API_TOKEN')
-        #print(f"API_TOKEN: {api_token}")  # Demonstrate that the token is loaded
+        #print(f"API_TOKEN: {redact(api_token)}")  # Demonstrate that the token is loaded
 
     def load_db_config(self):
-        self.db_config = {
-            'host': self.secrets_loader.get_credential('MYSQL_HOSTNAME'),
-            'user': self.secrets_loader.get_credential('MYSQL_USERNAME'),
-            'password': self.secrets_loader.get_credential('MYSQL_PASSWORD'),
-            'database': self.secrets_loader.get_credential('MYSQL_DB'),
-            'port': int(self.secrets_loader.get_credential('MYSQL_PORT')),
-        }
+        self.db_config = self.secrets_loader.get_config(MySQLConfig).connect_args
+
 
+    @property
+    def connection(self):
+        return self.db.connection
 
     def connect_to_database(self):
-        if self.connection is not None:
-            self.connection.close()
-        try:
-            self.connection = mysql.connector.connect(**self.db_config)
-            logging.info("Successfully connected to the database.")
-        except mysql.connector.Error as err:
-            logging.error(f"Database connection failed: {err}")
+        # The current connection keeps serving until the new credentials work
+        self.db.rotate(self.db_config)
+
+    def rebuild_connection(self, diff=None):
+        logging.info("Database secrets changed. Reconnecting with new secrets...")
+        self.load_db_config()
+        self.connect_to_database()
 
     def run(self, secrets_dirs):
-        # Set up watchdog
-        event_handler = SecretsChangeHandler(self.on_secrets_changed)
+        # Set up watchdog; events are coalesced into one reload per burst
+        reloader = DebouncedReloader(self.on_secrets_changed)
+        reloader.start()
+        event_handler = SecretsChangeHandler(reloader.trigger)
+        from watchdog.observers import Observer
         observer = Observer()
         for directory in secrets_dirs:
             observer.schedule(event_handler, directory, recursive=False)
@@ -65,6 +71,8 @@ class DatabaseConnector:
         except KeyboardInterrupt:
             observer.stop()
         observer.join()
+        reloader.stop()
+        self.reconnect.stop()
 
      #    def on_secrets_changed(self):
      #        logging.info("Secrets changed. Reloading and reconnecting...")
@@ -72,17 +80,17 @@ class DatabaseConnector:
      #        self.load_db_config()
      #        self.connect_to_database()
     def on_secrets_changed(self):
-         logging.info("Secrets changed. Waiting for file changes to settle...")
-         time.sleep(3)  # Wait a moment for the filesystem to update
+         # Runs on the reloader's worker once the burst of file events has settled;
+         # the consumers registered in __init__ react to the keys that changed.
+         # Reconnects are staggered across the fleet; get_credential() is already current.
          self.secrets_loader.load_secrets()
-    
-         logging.info("Reloading and reconnecting with new secrets...")
-         self.load_db_config()
-         self.connect_to_database()
-    
+
+    def on_token_changed(self, diff):
          api_token = self.secrets_loader.get_credential('API_TOKEN')
-         logging.info(f"Reloaded API_TOKEN: {api_token}")
+         logging.info(f"Reloaded API_TOKEN: {redact(api_token)}")
+
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     secrets_dirs = ['./local_secrets', './local_watch/token-secrets']
     db_connector = DatabaseConnector(secrets_dirs)
     db_connector.run(secrets_dirs)
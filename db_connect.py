@@ -1,20 +1,15 @@
-import mysql.connector
 from secrets_loader import SecretsLoader
+from secrets_schema import MySQLConfig
 
 def connect_to_database(secrets_dir):
     # Initialize the SecretsLoader
-    secrets_loader = SecretsLoader(secrets_dirs=[secrets_dir])
+    secrets_loader = SecretsLoader(secrets_dirs=[secrets_dir], schemas=[MySQLConfig])
 
     # Retrieve database credentials
-    db_config = {
-        'host': secrets_loader.get_credential('MYSQL_HOSTNAME'),
-        'user': secrets_loader.get_credential('MYSQL_USERNAME'),
-        'password': secrets_loader.get_credential('MYSQL_PASSWORD'),
-        'database': secrets_loader.get_credential('MYSQL_DB'),
-        'port': secrets_loader.get_credential('MYSQL_PORT'),
-    }
+    db_config = secrets_loader.get_config(MySQLConfig).connect_args
 
-    # Establish a database connection
+    # Establish a database connection; mysql.connector is only imported here
+    import mysql.connector
     try:
         connection = mysql.connector.connect(**db_config)
         print("Successfully connected to the database.")
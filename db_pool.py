@@ -0,0 +1,178 @@
+# db_pool.py
+import time
+import logging
+import threading
+from collections import deque
+from typing import Callable, Optional
+
+
+def mysql_connect(**kwargs):
+    """``mysql.connector.connect``, imported on first use rather than at module import."""
+    import mysql.connector
+    return mysql.connector.connect(**kwargs)
+
+
+class PoolTimeoutError(Exception):
+    """No connection became available within the requested timeout."""
+
+
+class PoolRetiredError(Exception):
+    """The pool was retired; acquire from its replacement instead."""
+
+
+class PoolUnavailableError(Exception):
+    """No pool is serving: the first one never connected, or the connector shut down."""
+
+
+def is_alive(connection) -> bool:
+    """``connection.is_connected()`` (a server ping for mysql.connector), or True
+    for connections that cannot tell."""
+    check = getattr(connection, 'is_connected', None)
+    return check() if check is not None else True
+
+
+class PoolMetrics:
+    """Checkout counters shared by successive pool generations.
+
+    ``wait`` is the time spent blocked on a free slot, ``checkout`` the full
+    time ``acquire()`` took, including opening a connection when the pool had
+    no idle one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.checkout_total = 0.0
+        self.checkout_max = 0.0
+
+    def record_checkout(self, wait: float, checkout: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self.checkout_total += checkout
+            self.checkout_max = max(self.checkout_max, checkout)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            checkouts = self.checkouts or 1
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_avg': self.wait_total / checkouts,
+                'wait_max': self.wait_max,
+                'checkout_avg': self.checkout_total / checkouts,
+                'checkout_max': self.checkout_max,
+            }
+
+
+class ConnectionPool:
+    """A bounded pool of connections opened with one set of credentials.
+
+    Retiring a pool closes its idle connections right away; connections that
+    are checked out keep working and are closed when they are released, so
+    in-flight queries are never killed by a credential rotation. A retired
+    pool never opens another connection: ``acquire()`` raises
+    PoolRetiredError.
+
+    A connection that sat idle for more than ``validate_after`` seconds is
+    checked with ``validate`` before it is handed out; one that fails (e.g.
+    dropped by the server's ``wait_timeout``) is closed and replaced by a
+    fresh connection. Recently used connections skip the check, so a busy
+    pool does not pay a ping round trip per checkout.
+    """
+
+    def __init__(self, db_config: dict, size: int = 5, connect: Optional[Callable] = None,
+                 metrics: Optional[PoolMetrics] = None, validate: Callable = is_alive,
+                 validate_after: float = 30.0):
+        self.db_config = db_config
+        self.size = size
+        self.metrics = metrics or PoolMetrics()
+        self._connect = connect or mysql_connect
+        self._validate = validate
+        self.validate_after = validate_after
+        self._slots = threading.BoundedSemaphore(size)
+        # (connection, monotonic time it became idle)
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._retired = False
+
+    def warm(self):
+        """Open every connection up front; raises if the credentials are not usable."""
+        opened = []
+        try:
+            for _ in range(self.size - len(self._idle)):
+                opened.append(self._connect(**self.db_config))
+        except Exception:
+            for connection in opened:
+                self._close(connection)
+            raise
+        now = time.monotonic()
+        with self._lock:
+            self._idle.extend((connection, now) for connection in opened)
+
+    def acquire(self, timeout: Optional[float] = None):
+        if self._retired:
+            raise PoolRetiredError("Connection pool has been retired")
+        start = time.monotonic()
+        if not self._slots.acquire(timeout=timeout):
+            self.metrics.record_timeout()
+            raise PoolTimeoutError(f"No connection available within {timeout}s")
+        waited = time.monotonic() - start
+        try:
+            connection = self._checkout()
+        except Exception:
+            self._slots.release()
+            raise
+        self.metrics.record_checkout(waited, time.monotonic() - start)
+        return connection
+
+    def _checkout(self):
+        while True:
+            with self._lock:
+                if self._retired:
+                    raise PoolRetiredError("Connection pool has been retired")
+                if not self._idle:
+                    break
+                connection, idle_since = self._idle.popleft()
+            if time.monotonic() - idle_since <= self.validate_after:
+                return connection
+            try:
+                if self._validate(connection):
+                    return connection
+            except Exception as e:
+                logging.debug("Idle connection check failed: %s", e)
+            logging.info("Dropping dead idle database connection.")
+            self._close(connection)
+        return self._connect(**self.db_config)
+
+    def release(self, connection):
+        try:
+            with self._lock:
+                if not self._retired:
+                    self._idle.append((connection, time.monotonic()))
+                    return
+            self._close(connection)
+        finally:
+            self._slots.release()
+
+    def retire(self):
+        with self._lock:
+            self._retired = True
+            idle = [connection for connection, _ in self._idle]
+            self._idle.clear()
+        for connection in idle:
+            self._close(connection)
+
+    def _close(self, connection):
+        try:
+            connection.close()
+        except Exception as e:
+            logging.warning(f"Failed to close database connection: {e}")
@@ -0,0 +1,133 @@
+# db_reconnect.py
+import time
+import random
+import logging
+import threading
+from typing import Callable, Optional
+
+from db_pool import mysql_connect
+
+
+class CircuitBreaker:
+    """Stop connection attempts after repeated failures.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    refuses attempts for ``reset_timeout`` seconds. It then lets a single
+    trial attempt through (half-open): success closes it, failure re-opens it.
+    Not thread-safe on its own; ResilientConnection calls it under its lock.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self._opened_at = 0.0
+
+    def allow(self) -> bool:
+        if self.state == 'open' and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self.state = 'half-open'
+        return self.state != 'open'
+
+    def retry_after(self) -> float:
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def record_success(self):
+        self.state = 'closed'
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == 'half-open' or self.failures >= self.failure_threshold:
+            if self.state != 'open':
+                logging.warning(f"Database circuit breaker opened after {self.failures} failures.")
+            self.state = 'open'
+            self._opened_at = time.monotonic()
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Exponential backoff with full jitter: uniform in [0, min(max, base * 2**attempt)]."""
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+class ResilientConnection:
+    """Hold one database connection and rotate its credentials safely.
+
+    ``rotate()`` validates new credentials by opening a side connection first
+    and only then swaps it in and closes the old one. While the new
+    credentials fail (e.g. rotation lag in MySQL) the current connection
+    keeps serving and the attempt is retried with exponential backoff and
+    jitter; further rotate() calls just update the pending config. A circuit
+    breaker caps how hard a failing database is hit.
+    """
+
+    def __init__(self, connect: Optional[Callable] = None, breaker: Optional[CircuitBreaker] = None,
+                 base_delay: float = 1.0, max_delay: float = 60.0):
+        self._connect = connect or mysql_connect
+        self.breaker = breaker or CircuitBreaker()
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.connection = None
+        self._pending: Optional[dict] = None
+        self._attempt = 0
+        self._retry_timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def rotate(self, db_config: dict) -> bool:
+        """Switch to ``db_config``; returns True if the new connection is live."""
+        with self._lock:
+            self._pending = db_config
+            if self._retry_timer is not None:
+                # A retry is already scheduled and will pick up the latest config
+                return False
+            return self._try_pending()
+
+    def _try_pending(self) -> bool:
+        if not self.breaker.allow():
+            self._schedule_retry(self.breaker.retry_after())
+            return False
+        try:
+            connection = self._connect(**self._pending)
+        except Exception as err:
+            self.breaker.record_failure()
+            delay = backoff_delay(self._attempt, self.base_delay, self.max_delay)
+            self._attempt += 1
+            serving = "keeping the current connection" if self.connection is not None else "no connection yet"
+            logging.error(f"Database connection failed ({serving}), retrying in {delay:.1f}s: {err}")
+            self._schedule_retry(delay)
+            return False
+        self.breaker.record_success()
+        self._attempt = 0
+        self._pending = None
+        old_connection, self.connection = self.connection, connection
+        if old_connection is not None:
+            self._close(old_connection)
+        logging.info("Successfully connected to the database.")
+        return True
+
+    def _schedule_retry(self, delay: float):
+        self._retry_timer = threading.Timer(delay, self._retry)
+        self._retry_timer.daemon = True
+        self._retry_timer.start()
+
+    def _retry(self):
+        with self._lock:
+            self._retry_timer = None
+            if self._pending is not None:
+                self._try_pending()
+
+    def _close(self, connection):
+        try:
+            connection.close()
+        except Exception as e:
+            logging.warning(f"Failed to close database connection: {e}")
+
+    def close(self):
+        with self._lock:
+            if self._retry_timer is not None:
+                self._retry_timer.cancel()
+                self._retry_timer = None
+            self._pending = None
+            if self.connection is not None:
+                self._close(self.connection)
+                self.connection = None
@@ -0,0 +1,183 @@
+# django_secrets.py
+"""Django integration for SecretsLoader.
+
+Add ``'django_secrets.SecretsAppConfig'`` to ``INSTALLED_APPS`` and
+``'django_secrets.SecretsConnectionMiddleware'`` to ``MIDDLEWARE``. Database
+credentials are mapped from secrets by ``SECRETS_DATABASES`` and applied to
+the connections of each thread when the snapshot version changes; other code
+reads secrets through ``secrets_settings``.
+"""
+import os
+import logging
+import threading
+from typing import Dict, Mapping, Optional
+
+from django.apps import AppConfig
+
+from secrets_loader import SecretsLoader
+
+# Django DATABASES key -> secret key, per database alias
+DEFAULT_DATABASE_SECRETS = {
+    'default': {
+        'NAME': 'MYSQL_DB',
+        'USER': 'MYSQL_USERNAME',
+        'PASSWORD': 'MYSQL_PASSWORD',
+        'HOST': 'MYSQL_HOSTNAME',
+        'PORT': 'MYSQL_PORT',
+    },
+}
+
+_loader: Optional[SecretsLoader] = None
+_loader_lock = threading.Lock()
+# Bumped by set_loader(); unlike id(loader), never reused for a new loader
+_loader_generation = 0
+# (loader generation, snapshot version) the current thread's connections were
+# last refreshed for; a new loader invalidates it in every thread, not just one
+_applied = threading.local()
+
+
+def set_loader(loader: Optional[SecretsLoader]):
+    """Use ``loader`` instead of building one from the settings (e.g. in tests);
+    None goes back to building one on first use."""
+    global _loader, _loader_generation
+    with _loader_lock:
+        _loader = loader
+        _loader_generation += 1
+
+
+def get_loader() -> SecretsLoader:
+    """The process-wide loader, built on first use from ``settings.SECRETS_DIRS``
+    (or the ``SECRETS_DIRS`` environment variable)."""
+    global _loader
+    if _loader is None:
+        with _loader_lock:
+            if _loader is None:
+                from django.conf import settings
+                secrets_dirs = getattr(settings, 'SECRETS_DIRS', None) or \
+                    [dir.strip() for dir in os.getenv('SECRETS_DIRS', './local_secrets').split(',')]
+                _loader = SecretsLoader(secrets_dirs=secrets_dirs, incremental=True)
+    return _loader
+
+
+class SecretsSettings:
+    """Read-only settings accessor: ``secrets_settings.API_TOKEN`` is looked up
+    in the current snapshot on every access, so it never goes stale and
+    nothing is copied into ``django.conf.settings``."""
+
+    def __getattr__(self, key: str) -> str:
+        value = get_loader().get_credential(key)
+        if value is None:
+            raise AttributeError(f"Secret {key} is not set")
+        return value
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        value = get_loader().get_credential(key)
+        return default if value is None else value
+
+    @property
+    def version(self) -> int:
+        return get_loader().version
+
+
+secrets_settings = SecretsSettings()
+
+
+def _database_secrets() -> Mapping[str, Mapping[str, str]]:
+    from django.conf import settings
+    return getattr(settings, 'SECRETS_DATABASES', DEFAULT_DATABASE_SECRETS)
+
+
+def database_settings(alias: str = 'default') -> Dict[str, str]:
+    """The DATABASES entries for ``alias`` taken from the current snapshot."""
+    credentials = get_loader().get_snapshot().credentials
+    return {setting: credentials[key] for setting, key in _database_secrets()[alias].items()
+            if key in credentials}
+
+
+def refresh_connections():
+    """Point this thread's connections at the current credentials.
+
+    Costs one tuple comparison while the loader and version are unchanged. After a
+    rotation, every connection whose settings moved is closed, so its next
+    query reconnects with the new credentials; connections inside a
+    transaction are left alone until the next call.
+    """
+    generation = _loader_generation
+    version = get_loader().version
+    applied = (generation, version)
+    if getattr(_applied, 'key', None) == applied:
+        return
+    from django.db import connections
+    done = True
+    for alias in _database_secrets():
+        connection = connections[alias]
+        values = database_settings(alias)
+        if all(connection.settings_dict.get(key) == value for key, value in values.items()):
+            continue
+        if connection.in_atomic_block:
+            done = False
+            continue
+        connection.close()
+        # A new dict per thread, so a connection opening in another thread
+        # never sees a half-updated one
+        connection.settings_dict = {**connection.settings_dict, **values}
+        logging.info(f"Database {alias} credentials changed (version {version}), connection closed.")
+    if done:
+        _applied.key = applied
+
+
+class SecretsConnectionMiddleware:
+    """Refresh the connections of the request's thread before each request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        refresh_connections()
+        return self.get_response(request)
+
+
+class SecretsPoller(threading.Thread):
+    """Reload the secrets in the background every ``interval`` seconds.
+
+    Incremental reloads only stat the files while nothing changes. Use
+    inotify_watcher or a secrets_watchdog sidecar instead for sub-second
+    reaction times.
+    """
+
+    def __init__(self, loader: SecretsLoader, interval: float = 5.0):
+        super().__init__(name='django-secrets-reload', daemon=True)
+        self.loader = loader
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.loader.load_secrets()
+            except Exception:
+                logging.exception("Secrets reload failed")
+
+    def stop(self):
+        self._stopped.set()
+
+
+class SecretsAppConfig(AppConfig):
+    """Load the secrets at startup and, with ``SECRETS_RELOAD_INTERVAL`` set,
+    keep reloading them in the background. ``DATABASES`` then only needs the
+    non-secret keys such as ``ENGINE`` and ``OPTIONS``."""
+
+    name = 'django_secrets'
+    label = 'django_secrets'
+
+    poller: Optional[SecretsPoller] = None
+
+    def ready(self):
+        from django.conf import settings
+        # Management commands never pass through the middleware, so give the
+        # main thread's connections their credentials now (no query is made).
+        refresh_connections()
+        interval = getattr(settings, 'SECRETS_RELOAD_INTERVAL', None)
+        if interval:
+            self.poller = SecretsPoller(get_loader(), interval)
+            self.poller.start()
@@ -1,13 +1,11 @@
-import mysql.connector
-from secrets_loader import SecretsLoader
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+from db_reconnect import ResilientConnection
+from secrets_loader import SecretsLoader, redact
+from secrets_schema import MySQLConfig
+from reload_scheduler import DebouncedReloader, FileEventHandler, StaggeredCallback, stagger_policy_from_env
 import logging
 import time
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-
-class SecretsChangeHandler(FileSystemEventHandler):
+class SecretsChangeHandler(FileEventHandler):
     def __init__(self, callback):
         self.callback = callback
 
@@ -21,53 +19,60 @@ class SecretsChangeHandler(FileSystemEventHandler):
             logging.info(f"Detected deletion of: {event.src_path}")
             self.callback()
 
+DB_SECRET_KEYS = ['MYSQL_HOSTNAME', 'MYSQL_USERNAME', 'MYSQL_PASSWORD', 'MYSQL_DB', 'MYSQL_PORT']
+TOKEN_SECRET_KEYS = ['API_TOKEN', 'AWS_SNS_TOPIC', 'KAFKA_URL']
+
 class DatabaseConnector:
     def __init__(self, db_secrets_dir, token_secrets_dir):
-        self.db_secrets_loader = SecretsLoader(secrets_dirs=[db_secrets_dir])
-        self.token_secrets_loader = SecretsLoader(secrets_dirs=[token_secrets_dir])
-        self.connection = None
+        self.db_secrets_loader = SecretsLoader(secrets_dirs=[db_secrets_dir], incremental=True, schemas=[MySQLConfig])
+        self.token_secrets_loader = SecretsLoader(secrets_dirs=[token_secrets_dir], incremental=True)
+        self.db = ResilientConnection()
         self.load_db_config()
         self.connect_to_database()
+        # Only rebuild what depends on the keys that actually changed
+        # Reconnects are staggered across the fleet; get_credential() sees new values at once
+        self.reconnect = StaggeredCallback(self.on_db_secrets_changed, stagger_policy_from_env())
+        self.db_secrets_loader.register_consumer(DB_SECRET_KEYS, self.reconnect)
+        self.token_secrets_loader.register_consumer(TOKEN_SECRET_KEYS, self.on_token_secrets_changed)
 
     def load_db_config(self):
-        self.db_config = {
-            'host': self.db_secrets_loader.get_credential('MYSQL_HOSTNAME'),
-            'user': self.db_secrets_loader.get_credential('MYSQL_USERNAME'),
-            'password': self.db_secrets_loader.get_credential('MYSQL_PASSWORD'),
-            'database': self.db_secrets_loader.get_credential('MYSQL_DB'),
-            'port': int(self.db_secrets_loader.get_credential('MYSQL_PORT')),
-        }
+        self.db_config = self.db_secrets_loader.get_config(MySQLConfig).connect_args
+
+    @property
+    def connection(self):
+        return self.db.connection
 
     def connect_to_database(self):
-        if self.connection is not None:
-            self.connection.close()
-        try:
-            self.connection = mysql.connector.connect(**self.db_config)
-            logging.info("Successfully connected to the database.")
-        except mysql.connector.Error as err:
-            logging.error(f"Database connection failed: {err}")
+        # The current connection keeps serving until the new credentials work
+        self.db.rotate(self.db_config)
 
     def load_and_log_additional_secrets(self):
         # Reload and log additional secrets including API_TOKEN
         api_token = self.token_secrets_loader.get_credential('API_TOKEN')
         aws_sns_topic = self.token_secrets_loader.get_credential('AWS_SNS_TOPIC')
         kafka_url = self.token_secrets_loader.get_credential('KAFKA_URL')
-        logging.info(f"Reloaded API_TOKEN: {api_token}")
-        logging.info(f"Reloaded AWS_SNS_TOPIC: {aws_sns_topic}")
-        logging.info(f"Reloaded KAFKA_URL: {kafka_url}")
+        logging.info(f"Reloaded API_TOKEN: {redact(api_token)}")
+        logging.info(f"Reloaded AWS_SNS_TOPIC: {redact(aws_sns_topic)}")
+        logging.info(f"Reloaded KAFKA_URL: {redact(kafka_url)}")
 
-    def on_secrets_changed(self):
-        logging.info("Secrets changed. Waiting for file changes to settle...")
-        time.sleep(3)  # Delay to ensure file changes are completed
-        logging.info("Reloading and reconnecting with new secrets...")
-        self.db_secrets_loader.load_secrets()
-        self.token_secrets_loader.load_secrets()
+    def on_db_secrets_changed(self, diff):
+        logging.info("Database secrets changed. Reconnecting with new secrets...")
         self.load_db_config()
         self.connect_to_database()
+
+    def on_token_secrets_changed(self, diff):
         self.load_and_log_additional_secrets()
 
+    def on_secrets_changed(self):
+        # Registered consumers are invoked by the loaders for the keys that moved
+        self.db_secrets_loader.load_secrets()
+        self.token_secrets_loader.load_secrets()
+
     def run(self, secrets_dirs):
-        event_handler = SecretsChangeHandler(self.on_secrets_changed)
+        reloader = DebouncedReloader(self.on_secrets_changed)
+        reloader.start()
+        event_handler = SecretsChangeHandler(reloader.trigger)
+        from watchdog.observers import Observer
         observer = Observer()
         for directory in secrets_dirs:
             observer.schedule(event_handler, directory, recursive=False)
@@ -78,10 +83,12 @@ class DatabaseConnector:
         except KeyboardInterrupt:
             observer.stop()
             observer.join()
-            if self.connection:
-                self.connection.close()  # Ensure the database connection is closed gracefully
+            reloader.stop()
+            self.reconnect.stop()
+            self.db.close()  # Ensure the database connection is closed gracefully
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     secrets_dirs = ['./local_secrets', './local_watch/token-secrets']
     db_connector = DatabaseConnector(*secrets_dirs)
     db_connector.run(secrets_dirs)
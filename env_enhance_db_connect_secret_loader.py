@@ -1,15 +1,13 @@
 import os
-import mysql.connector
-from secrets_loader import SecretsLoader
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+from db_reconnect import ResilientConnection
+from secrets_loader import SecretsLoader, redact
+from secrets_schema import MySQLConfig
+from secrets_providers import providers_from_env
+from reload_scheduler import DebouncedReloader, FileEventHandler, StaggeredCallback, stagger_policy_from_env
 import logging
 import time
 
-# Setup logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-
-class SecretsChangeHandler(FileSystemEventHandler):
+class SecretsChangeHandler(FileEventHandler):
     def __init__(self, callback):
         self.callback = callback
 
@@ -23,57 +21,66 @@ class SecretsChangeHandler(FileSystemEventHandler):
             logging.info(f"Detected deletion of: {event.src_path}")
             self.callback()
 
+DB_SECRET_KEYS = ['MYSQL_HOSTNAME', 'MYSQL_USERNAME', 'MYSQL_PASSWORD', 'MYSQL_DB', 'MYSQL_PORT']
+TOKEN_SECRET_KEYS = ['API_TOKEN', 'AWS_SNS_TOPIC', 'KAFKA_URL']
+
 class DatabaseConnector:
-    def __init__(self, secrets_dirs):
-        # Initialize SecretsLoader with directories provided
-        self.db_secrets_loader = SecretsLoader(secrets_dirs=secrets_dirs)
-        self.token_secrets_loader = SecretsLoader(secrets_dirs=secrets_dirs)
-        self.connection = None
+    def __init__(self, secrets_dirs, providers=None):
+        # Initialize SecretsLoader with directories provided; providers
+        # (bundle file, environment) override the directories
+        self.db_secrets_loader = SecretsLoader(secrets_dirs=secrets_dirs, incremental=True, providers=providers,
+                                              schemas=[MySQLConfig])
+        self.token_secrets_loader = SecretsLoader(secrets_dirs=secrets_dirs, incremental=True, providers=providers)
+        self.db = ResilientConnection()
         self.load_db_config()
         self.connect_to_database()
+        # Only rebuild what depends on the keys that actually changed. Reconnects
+        # are staggered across the fleet; get_credential() sees new values at once.
+        self.reconnect = StaggeredCallback(self.on_db_secrets_changed, stagger_policy_from_env())
+        self.db_secrets_loader.register_consumer(DB_SECRET_KEYS, self.reconnect)
+        self.token_secrets_loader.register_consumer(TOKEN_SECRET_KEYS, self.on_token_secrets_changed)
 
     def load_db_config(self):
         # Load or reload database configuration from secrets
-        self.db_config = {
-            'host': self.db_secrets_loader.get_credential('MYSQL_HOSTNAME'),
-            'user': self.db_secrets_loader.get_credential('MYSQL_USERNAME'),
-            'password': self.db_secrets_loader.get_credential('MYSQL_PASSWORD'),
-            'database': self.db_secrets_loader.get_credential('MYSQL_DB'),
-            'port': self.db_secrets_loader.get_credential('MYSQL_PORT'),
-        }
+        self.db_config = self.db_secrets_loader.get_config(MySQLConfig).connect_args
+
+    @property
+    def connection(self):
+        return self.db.connection
 
     def connect_to_database(self):
-        # Connect to the database using the loaded configuration
-        if self.connection is not None:
-            self.connection.close()
-        try:
-            self.connection = mysql.connector.connect(**self.db_config)
-            logging.info("Successfully connected to the database.")
-        except mysql.connector.Error as err:
-            logging.error(f"Database connection failed: {err}")
+        # The current connection keeps serving until the new credentials work
+        self.db.rotate(self.db_config)
 
     def load_and_log_additional_secrets(self):
         # Reload and log additional secrets
         api_token = self.token_secrets_loader.get_credential('API_TOKEN')
         aws_sns_topic = self.token_secrets_loader.get_credential('AWS_SNS_TOPIC')
         kafka_url = self.token_secrets_loader.get_credential('KAFKA_URL')
-        logging.info(f"Reloaded API_TOKEN: {api_token}")
-        logging.info(f"Reloaded AWS_SNS_TOPIC: {aws_sns_topic}")
-        logging.info(f"Reloaded KAFKA_URL: {kafka_url}")
+        logging.info(f"Reloaded API_TOKEN: {redact(api_token)}")
+        logging.info(f"Reloaded AWS_SNS_TOPIC: {redact(aws_sns_topic)}")
+        logging.info(f"Reloaded KAFKA_URL: {redact(kafka_url)}")
 
-    def on_secrets_changed(self):
-        # Handle secrets changes: reload secrets and update configurations
-        logging.info("Secrets changed. Waiting for file changes to settle...")
-        time.sleep(3)  # Delay to ensure file changes are completed
-        self.db_secrets_loader.load_secrets()
-        self.token_secrets_loader.load_secrets()
+    def on_db_secrets_changed(self, diff):
+        # Database credentials moved: rebuild the config and reconnect
         self.load_db_config()
         self.connect_to_database()
+
+    def on_token_secrets_changed(self, diff):
         self.load_and_log_additional_secrets()
 
+    def on_secrets_changed(self):
+        # Handle secrets changes: reload secrets; registered consumers rebuild
+        # only the resources whose keys changed
+        self.db_secrets_loader.load_secrets()
+        self.token_secrets_loader.load_secrets()
+
     def run(self):
         # Set up and start the watchdog observer for secrets directories
-        event_handler = SecretsChangeHandler(self.on_secrets_changed)
+        reloader = DebouncedReloader(self.on_secrets_changed)
+        reloader.start()
+        event_handler = SecretsChangeHandler(reloader.trigger)
+        from watchdog.observers import Observer
         observer = Observer()
         for directory in self.db_secrets_loader.secrets_dirs:
             observer.schedule(event_handler, directory, recursive=False)
@@ -86,10 +93,12 @@ class DatabaseConnector:
             observer.stop()
             logging.info("Stopping enhanced DB and secrets connector...")
         observer.join()
-        if self.connection:
-            self.connection.close()  # Ensure database connection is closed gracefully
+        reloader.stop()
+        self.reconnect.stop()
+        self.db.close()  # Ensure the database connection is closed gracefully
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     # Fetch secrets directories from an environment variable, split by commas, and strip spaces
     secrets_dirs_env = os.getenv('SECRETS_DIRS', './default/path/to/secrets').split(',')
     secrets_dirs = [dir.strip() for dir in secrets_dirs_env]
@@ -97,5 +106,6 @@ if __name__ == "__main__":
     # Announcement that SECRETS_DIRS was detected and is being used
     logging.info(f"SECRETS_DIRS detected: {', '.join(secrets_dirs)}")
 
-    db_connector = DatabaseConnector(secrets_dirs)
+    # Optional SECRETS_BUNDLE / SECRETS_ENV_PREFIX sources on top of the directories
+    db_connector = DatabaseConnector(secrets_dirs, providers_from_env())
     db_connector.run()
\ No newline at end of file
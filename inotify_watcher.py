@@ -0,0 +1,173 @@
+# inotify_watcher.py
+import os
+import sys
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import logging
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0o2000000)
+
+# A write is only reported once the writer closes the file, so we never see
+# partial content. Atomic-rename writers, including the kubelet's ``..data``
+# swap, show up as IN_MOVED_TO on the parent directory.
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR
+
+_EVENT_HEADER = struct.Struct('iIII')
+_READ_SIZE = 64 * 1024
+
+
+class InotifyEvent(NamedTuple):
+    mask: int
+    dir_path: Optional[str]
+    name: str
+
+    @property
+    def src_path(self) -> Optional[str]:
+        if self.dir_path is None:
+            return None
+        return os.path.join(self.dir_path, self.name) if self.name else self.dir_path
+
+    @property
+    def is_directory(self) -> bool:
+        return bool(self.mask & IN_ISDIR)
+
+    @property
+    def is_overflow(self) -> bool:
+        """The kernel queue overflowed; events were lost and a full reload is needed."""
+        return bool(self.mask & IN_Q_OVERFLOW)
+
+
+def inotify_available() -> bool:
+    return sys.platform.startswith('linux') and _libc() is not None
+
+
+_libc_handle = None
+
+
+def _libc():
+    global _libc_handle
+    if _libc_handle is None:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            libc.inotify_init1.argtypes = [ctypes.c_int]
+            libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        except (OSError, AttributeError):
+            return None
+        _libc_handle = libc
+    return _libc_handle
+
+
+class InotifyWatcher:
+    """Watch secret directories with Linux inotify.
+
+    Can be used in place of the watchdog ``Observer``: the callback receives
+    every event decoded from one ``read()`` as a single batch. ``run()``
+    blocks in ``select()`` while idle, so it costs no CPU between events and
+    can replace the ``while True: time.sleep(...)`` main loop. ``start()``
+    runs the same loop on a daemon thread instead.
+
+    With ``ignore_hidden`` the kubelet's timestamped dot-entries are dropped
+    and only the ``..data`` swap and visible files are reported.
+    """
+
+    def __init__(self, paths: List[str], callback: Callable[[List[InotifyEvent]], None],
+                 ignore_hidden: bool = True):
+        libc = _libc()
+        if libc is None:
+            raise OSError(errno.ENOSYS, "inotify is not available on this platform")
+        self.callback = callback
+        self.ignore_hidden = ignore_hidden
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watches: Dict[int, str] = {}
+        self._stop_r, self._stop_w = os.pipe()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        try:
+            for path in paths:
+                self.add_watch(path)
+        except BaseException:
+            self._close()
+            raise
+
+    def add_watch(self, path: str):
+        wd = _libc().inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"Cannot watch {path}: {os.strerror(err)}")
+        self._watches[wd] = path
+
+    def _parse(self, data: bytes) -> List[InotifyEvent]:
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            if self.ignore_hidden and name.startswith('.') and name != '..data':
+                continue
+            events.append(InotifyEvent(mask, self._watches.get(wd), name))
+        return events
+
+    def run(self):
+        try:
+            while True:
+                ready, _, _ = select.select([self._fd, self._stop_r], [], [])
+                if self._stop_r in ready:
+                    return
+                try:
+                    data = os.read(self._fd, _READ_SIZE)
+                except BlockingIOError:
+                    continue
+                events = self._parse(data)
+                if events:
+                    try:
+                        self.callback(events)
+                    except Exception:
+                        logging.exception("Secrets watch callback failed")
+        finally:
+            self._close()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name='inotify-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._closed:
+            return
+        try:
+            os.write(self._stop_w, b'x')
+        except OSError:
+            pass
+
+    def join(self, timeout: Optional[float] = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _close(self):
+        self._closed = True
+        for fd in (self._fd, self._stop_r, self._stop_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
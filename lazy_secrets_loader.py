@@ -0,0 +1,221 @@
+# lazy_secrets_loader.py
+import os
+import stat
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+from secrets_loader import CredentialsSnapshot, ReloadStats, SecretsDiff, SecretsLoader
+
+# (inode, mtime_ns, size)
+StatKey = Tuple[int, int, int]
+
+
+class _IndexEntry(NamedTuple):
+    path: str
+    stat_key: StatKey
+    dir_path: str
+
+
+class _CachedValue:
+    __slots__ = ('stat_key', 'data', 'text', 'validated_at')
+
+    def __init__(self, stat_key: StatKey, data: bytes, validated_at: float):
+        self.stat_key = stat_key
+        self.data = data
+        self.text: Optional[str] = None
+        self.validated_at = validated_at
+
+
+class _LazyCredentials(Mapping):
+    """Read-only view over one index generation; values load on first access."""
+
+    def __init__(self, loader: 'LazySecretsLoader', index: Dict[str, _IndexEntry]):
+        self._loader = loader
+        self._index = index
+
+    def __getitem__(self, key: str) -> str:
+        entry = self._index[key]
+        return self._loader._text(entry)
+
+    def __contains__(self, key) -> bool:
+        return key in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+
+def _stat_key(st: os.stat_result) -> StatKey:
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+class LazySecretsLoader(SecretsLoader):
+    """SecretsLoader that indexes the secret files and reads them on first use.
+
+    ``load_secrets()`` only lists and stats the directories, so construction
+    and reloads never read blobs that nobody asks for. Values live in an LRU
+    cache bounded by ``max_cache_bytes``; a cached value is revalidated with a
+    ``stat()`` once it is older than ``revalidate_after`` seconds. Values
+    larger than the whole cache are read on every access and never cached.
+
+    ``get_bytes()`` returns the file contents as-is (wrap it in a
+    ``memoryview`` to slice without copying); ``get_credential()`` decodes and
+    strips once per cached value.
+    """
+
+    def __init__(self, secrets_dirs: List[str], expected_keys: List[str] = [],
+                 max_cache_bytes: int = 1024 * 1024, revalidate_after: float = 1.0, **options):
+        if options.get('providers'):
+            raise ValueError("LazySecretsLoader only indexes directories; use SecretsLoader for providers")
+        self.max_cache_bytes = max_cache_bytes
+        self.revalidate_after = revalidate_after
+        self._index: Dict[str, _IndexEntry] = {}
+        self._cache: 'OrderedDict[str, _CachedValue]' = OrderedDict()
+        self._cache_bytes = 0
+        self._cache_lock = threading.Lock()
+        # sha256 of the values read so far, by (key, stat key); survives cache
+        # eviction so a new generation with the same bytes is not a change
+        self._digests: Dict[Tuple[str, StatKey], bytes] = {}
+        super().__init__(secrets_dirs, expected_keys, **options)
+
+    def load_secrets(self) -> SecretsDiff:
+        """Re-index the directories; only the stat fingerprints are compared."""
+        with self._reload_lock:
+            started = time.perf_counter()
+            index = {}
+            for dir_path in self.secrets_dirs:
+                if not os.path.isdir(dir_path):
+                    logging.warning(f"Directory {dir_path} does not exist or is not accessible.")
+                    continue
+                for scan_path in self._list_dir(self._resolve_generation(dir_path)):
+                    # Prefer the stable top-level name: in a Kubernetes volume it
+                    # is a symlink through ``..data``, so reads keep working after
+                    # the kubelet swaps the generation and deletes the old one.
+                    secret_path = os.path.join(dir_path, os.path.basename(scan_path))
+                    if not os.path.exists(secret_path):
+                        secret_path = scan_path
+                    try:
+                        st = os.stat(secret_path)
+                    except OSError as e:
+                        logging.error(f"Failed to read secret from {secret_path}: {e}")
+                        continue
+                    if stat.S_ISREG(st.st_mode):
+                        index[os.path.basename(secret_path)] = _IndexEntry(secret_path, _stat_key(st), dir_path)
+
+            previous = self._index
+            diff = SecretsDiff(
+                added={key for key in index if key not in previous},
+                changed={key for key in index if key in previous and previous[key].stat_key != index[key].stat_key
+                         and not self._same_content(key, previous[key], index[key])},
+                removed={key for key in previous if key not in index},
+            )
+            self._index = index
+            with self._cache_lock:
+                for key in diff.changed | diff.removed:
+                    self._evict(previous[key].path)
+                current = {(key, entry.stat_key) for key, entry in index.items()}
+                self._digests = {version: digest for version, digest in self._digests.items() if version in current}
+            self._record_reload(ReloadStats(len(index), 0, 0, len(diff.keys),
+                                            time.perf_counter() - started), diff)
+            if diff:
+                self._publish(CredentialsSnapshot(self._snapshot.version + 1, _LazyCredentials(self, index)))
+                self._notify_consumers(diff)
+            return diff
+
+    def _same_content(self, key: str, previous: _IndexEntry, entry: _IndexEntry) -> bool:
+        """For a key whose file moved (e.g. a new ``..data`` generation), compare
+        the new bytes with the previously indexed ones. Keys that were never
+        read count as changed."""
+        previous_digest = self._digests.get((key, previous.stat_key))
+        if previous_digest is None:
+            return False
+        if (key, entry.stat_key) not in self._digests and self._read(entry, time.monotonic()) is None:
+            return False
+        return self._digests.get((key, entry.stat_key)) == previous_digest
+
+    def _evict(self, path: str):
+        cached = self._cache.pop(path, None)
+        if cached is not None:
+            self._cache_bytes -= len(cached.data)
+
+    def _cached(self, entry: _IndexEntry) -> Optional[_CachedValue]:
+        now = time.monotonic()
+        with self._cache_lock:
+            cached = self._cache.get(entry.path)
+            if cached is not None:
+                self._cache.move_to_end(entry.path)
+                if now - cached.validated_at < self.revalidate_after:
+                    return cached
+        if cached is not None:
+            try:
+                if _stat_key(os.stat(entry.path)) == cached.stat_key:
+                    cached.validated_at = now
+                    return cached
+            except OSError:
+                pass
+        return self._read(entry, now)
+
+    def _open(self, entry: _IndexEntry):
+        try:
+            return open(entry.path, 'rb')
+        except FileNotFoundError:
+            if not self.snapshot:
+                raise
+        # The generation this entry was indexed from is gone; follow ``..data``
+        return open(os.path.join(self._resolve_generation(entry.dir_path), os.path.basename(entry.path)), 'rb')
+
+    def _read(self, entry: _IndexEntry, now: float) -> Optional[_CachedValue]:
+        """Read ``entry`` from disk and put it in the cache."""
+        try:
+            with self._open(entry) as file:
+                st = os.fstat(file.fileno())
+                data = file.read()
+        except OSError as e:
+            logging.error(f"Failed to read secret from {entry.path}: {e}")
+            self.metrics.increment('secrets.read_errors')
+            return None
+        import hashlib
+        logging.debug("Loaded secret from %s", entry.path)
+        self.metrics.increment('secrets.files_read')
+        self.metrics.increment('secrets.bytes_read', len(data))
+        self._digests[(os.path.basename(entry.path), _stat_key(st))] = hashlib.sha256(data).digest()
+        cached = _CachedValue(_stat_key(st), data, now)
+        if len(data) > self.max_cache_bytes:
+            return cached
+        with self._cache_lock:
+            self._evict(entry.path)
+            self._cache[entry.path] = cached
+            self._cache_bytes += len(data)
+            while self._cache_bytes > self.max_cache_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= len(evicted.data)
+                self.metrics.increment('secrets.cache_evictions')
+        return cached
+
+    def _text(self, entry: _IndexEntry) -> Optional[str]:
+        cached = self._cached(entry)
+        if cached is None:
+            return None
+        if cached.text is None:
+            try:
+                cached.text = cached.data.decode().strip()
+            except UnicodeDecodeError as e:
+                logging.error(f"Failed to decode secret from {entry.path}: {type(e).__name__}; use get_bytes() instead.")
+                return None
+        return cached.text
+
+    def get_credential(self, key: str) -> Optional[str]:
+        entry = self._index.get(key)
+        return self._text(entry) if entry is not None else None
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        entry = self._index.get(key)
+        if entry is None:
+            return None
+        cached = self._cached(entry)
+        return cached.data if cached is not None else None
@@ -1,29 +1,24 @@
-import mysql.connector
 import time
-from secrets_loader import SecretsLoader
+from secrets_loader import SecretsLoader, redact
+from secrets_schema import MySQLConfig
 
 class DatabaseConnector:
     def __init__(self, secrets_dirs):
-        self.secrets_loader = SecretsLoader(secrets_dirs=secrets_dirs)
+        self.secrets_loader = SecretsLoader(secrets_dirs=secrets_dirs, schemas=[MySQLConfig])
         self.db_config = None
         self.load_db_config()
 
     def load_db_config(self):
         """Load or reload the database configuration from secrets."""
-        self.db_config = {
-            'host': self.secrets_loader.get_credential('MYSQL_HOSTNAME'),
-            'user': self.secrets_loader.get_credential('MYSQL_USERNAME'),
-            'password': self.secrets_loader.get_credential('MYSQL_PASSWORD'),
-            'database': self.secrets_loader.get_credential('MYSQL_DB'),
-            'port': int(self.secrets_loader.get_credential('MYSQL_PORT')),
-        }
+        self.db_config = self.secrets_loader.get_config(MySQLConfig).connect_args
 
         # After loading the secrets, access and print the API token
         api_token = self.secrets_loader.get_credential('API_TOKEN')
-        print(f"API_TOKEN: {api_token}")  # Demonstrate that the token is loaded
+        print(f"API_TOKEN: {redact(api_token)}")  # Demonstrate that the token is loaded
 
     def connect_to_database(self):
         """Establish a database connection using the loaded configuration."""
+        import mysql.connector  # Imported on first connect, not at module import
         try:
             connection = mysql.connector.connect(**self.db_config)
             print("Successfully connected to the database.")
@@ -0,0 +1,137 @@
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from secrets_loader import SecretsLoader
+from secrets_schema import MySQLConfig
+from reload_scheduler import DebouncedReloader, FileEventHandler, StaggeredCallback, stagger_policy_from_env
+from db_pool import ConnectionPool, PoolMetrics, PoolRetiredError, PoolUnavailableError
+from db_reconnect import backoff_delay
+
+class SecretsChangeHandler(FileEventHandler):
+    def __init__(self, callback):
+        self.callback = callback
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            logging.info(f"Detected modification in: {event.src_path}")
+            self.callback()
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            logging.info(f"Detected deletion of: {event.src_path}")
+            self.callback()
+
+DB_SECRET_KEYS = ['MYSQL_HOSTNAME', 'MYSQL_USERNAME', 'MYSQL_PASSWORD', 'MYSQL_DB', 'MYSQL_PORT']
+
+class DatabaseConnector:
+    """Serve connections from a pool and hot-swap it when the secrets rotate.
+
+    If the new pool cannot be warmed (e.g. the database has not picked up the
+    rotated password yet), the current pool keeps serving and the rebuild is
+    retried with exponential backoff and jitter, re-reading the latest
+    secrets each time.
+    """
+
+    def __init__(self, secrets_dirs, pool_size=5, base_delay=1.0, max_delay=60.0):
+        self.secrets_loader = SecretsLoader(secrets_dirs=secrets_dirs, incremental=True, schemas=[MySQLConfig])
+        self.pool_size = pool_size
+        self.metrics = PoolMetrics()
+        self.pool = None
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._attempt = 0
+        self._retry_timer = None
+        self._swap_lock = threading.Lock()
+        self.reconnect = StaggeredCallback(self.rebuild_pool, stagger_policy_from_env())
+        self.load_db_config()
+        self.swap_pool()
+        # Rebuild the pool only when a database key changed
+        self.secrets_loader.register_consumer(DB_SECRET_KEYS, self.reconnect)
+
+    def load_db_config(self):
+        self.db_config = self.secrets_loader.get_config(MySQLConfig).connect_args
+
+    def swap_pool(self):
+        # Warm the new pool before switching, so a failed rotation leaves the
+        # current pool serving traffic.
+        with self._swap_lock:
+            self._cancel_retry()
+            new_pool = ConnectionPool(self.db_config, size=self.pool_size, metrics=self.metrics)
+            try:
+                new_pool.warm()
+            except Exception as err:
+                delay = backoff_delay(self._attempt, self.base_delay, self.max_delay)
+                self._attempt += 1
+                logging.error(f"Database connection failed, keeping the current pool, retrying in {delay:.1f}s: {err}")
+                self._retry_timer = threading.Timer(delay, self.rebuild_pool)
+                self._retry_timer.daemon = True
+                self._retry_timer.start()
+                return
+            self._attempt = 0
+            old_pool, self.pool = self.pool, new_pool
+        if old_pool is not None:
+            old_pool.retire()  # Checked-out connections drain as they are released
+        logging.info("Successfully connected to the database.")
+
+    def _cancel_retry(self):
+        if self._retry_timer is not None:
+            self._retry_timer.cancel()
+            self._retry_timer = None
+
+    @contextmanager
+    def connection(self, timeout=None):
+        while True:
+            pool = self.pool
+            if pool is None:
+                raise PoolUnavailableError("No database pool is serving (not connected yet, or shut down)")
+            try:
+                connection = pool.acquire(timeout)
+                break
+            except PoolRetiredError:
+                if self.pool is pool:
+                    raise
+                # Swapped between lookup and acquire; retry on the new pool
+        try:
+            yield connection
+        finally:
+            pool.release(connection)
+
+    def on_secrets_changed(self):
+        self.secrets_loader.load_secrets()
+
+    def rebuild_pool(self, diff=None):
+        logging.info("Reloading and reconnecting with new secrets...")
+        self.load_db_config()
+        self.swap_pool()
+        logging.info(f"Pool metrics: {self.metrics.as_dict()}")
+
+    def run(self):
+        reloader = DebouncedReloader(self.on_secrets_changed)
+        reloader.start()
+        event_handler = SecretsChangeHandler(reloader.trigger)
+        from watchdog.observers import Observer
+        observer = Observer()
+        for directory in self.secrets_loader.secrets_dirs:
+            observer.schedule(event_handler, directory, recursive=False)
+        observer.start()
+        try:
+            while True:
+                time.sleep(10)
+        except KeyboardInterrupt:
+            observer.stop()
+        observer.join()
+        reloader.stop()
+        self.reconnect.stop()
+        with self._swap_lock:
+            self._cancel_retry()
+            pool, self.pool = self.pool, None
+        if pool is not None:
+            pool.retire()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    secrets_dirs = [dir.strip() for dir in os.getenv('SECRETS_DIRS', './local_secrets').split(',')]
+    db_connector = DatabaseConnector(secrets_dirs)
+    db_connector.run()
@@ -1,13 +1,12 @@
 import time
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
 from secrets_loader import SecretsLoader
-import mysql.connector
+from secrets_schema import MySQLConfig
+from inotify_watcher import InotifyWatcher, inotify_available
+from reload_scheduler import DebouncedReloader, FileEventHandler, StaggeredCallback, stagger_policy_from_env
+from db_reconnect import ResilientConnection
 import logging
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-
-class SecretsChangeHandler(FileSystemEventHandler):
+class SecretsChangeHandler(FileEventHandler):
     def __init__(self, callback):
         self.callback = callback
 
@@ -16,35 +15,59 @@ class SecretsChangeHandler(FileSystemEventHandler):
             logging.info(f"Detected change in: {event.src_path}")
             self.callback()
 
+DB_SECRET_KEYS = ['MYSQL_HOSTNAME', 'MYSQL_USERNAME', 'MYSQL_PASSWORD', 'MYSQL_DB', 'MYSQL_PORT']
+
 class DatabaseConnector:
     def __init__(self, secrets_dirs):
-        self.secrets_loader = SecretsLoader(secrets_dirs=secrets_dirs)
+        self.secrets_loader = SecretsLoader(secrets_dirs=secrets_dirs, schemas=[MySQLConfig])
         self.db_config = None
-        self.connection = None
+        self.db = ResilientConnection()
+        self.reconnect = StaggeredCallback(self.rebuild_connection, stagger_policy_from_env())
         self.load_db_config()
         self.connect_to_database()
+        # Reconnect only when a database key changed, not for every rotation
+        self.secrets_loader.register_consumer(DB_SECRET_KEYS, self.reconnect)
 
     def load_db_config(self):
-        self.db_config = {
-            'host': self.secrets_loader.get_credential('MYSQL_HOSTNAME'),
-            'user': self.secrets_loader.get_credential('MYSQL_USERNAME'),
-            'password': self.secrets_loader.get_credential('MYSQL_PASSWORD'),
-            'database': self.secrets_loader.get_credential('MYSQL_DB'),
-            'port': int(self.secrets_loader.get_credential('MYSQL_PORT')),
-        }
+        self.db_config = self.secrets_loader.get_config(MySQLConfig).connect_args
+
+    @property
+    def connection(self):
+        return self.db.connection
 
     def connect_to_database(self):
-        if self.connection is not None:
-            self.connection.close()
-        try:
-            self.connection = mysql.connector.connect(**self.db_config)
-            logging.info("Successfully connected to the database.")
-        except mysql.connector.Error as err:
-            logging.error(f"Database connection failed: {err}")
+        # The current connection keeps serving until the new credentials work
+        self.db.rotate(self.db_config)
+
+    def rebuild_connection(self, diff=None):
+        logging.info("Database secrets changed. Reconnecting with new secrets...")
+        self.load_db_config()
+        self.connect_to_database()
 
     def run(self, secrets_dirs):
+        # A rotation arrives as several batches of events; reload once it settles
+        reloader = DebouncedReloader(self.on_secrets_changed)
+        reloader.start()
+        try:
+            self.watch(secrets_dirs, reloader.trigger)
+        finally:
+            reloader.stop()
+            self.reconnect.stop()
+
+    def watch(self, secrets_dirs, trigger):
+        if inotify_available():
+            # Close-write/move/delete events only; blocks in the kernel while
+            # idle instead of polling.
+            watcher = InotifyWatcher(secrets_dirs, lambda events: trigger())
+            try:
+                watcher.run()
+            except KeyboardInterrupt:
+                pass
+            return
+
         # Set up watchdog
-        event_handler = SecretsChangeHandler(self.on_secrets_changed)
+        event_handler = SecretsChangeHandler(trigger)
+        from watchdog.observers import Observer
         observer = Observer()
         for directory in secrets_dirs:
             observer.schedule(event_handler, directory, recursive=False)
@@ -57,12 +80,12 @@ class DatabaseConnector:
         observer.join()
 
     def on_secrets_changed(self):
-        logging.info("Secrets changed. Reloading and reconnecting...")
+        # Runs on the reloader's worker once the burst of events has settled;
+        # the DB_SECRET_KEYS consumer reconnects if one of them changed
         self.secrets_loader.load_secrets()
-        self.load_db_config()
-        self.connect_to_database()
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     secrets_dirs = ['./local_secrets', './local_watch/token-secrets']
     db_connector = DatabaseConnector(secrets_dirs)
     db_connector.run(secrets_dirs)
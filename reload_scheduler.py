@@ -0,0 +1,200 @@
+# reload_scheduler.py
+import os
+import time
+import logging
+import threading
+from typing import Callable, Mapping, Optional
+
+
+class DebouncedReloader:
+    """Collapse bursts of filesystem events into a single reload.
+
+    ``trigger()`` is cheap and never blocks, so it can be called straight from
+    the watchdog observer thread. The callback runs on a dedicated worker once
+    no new event has arrived for ``quiet_period`` seconds, or at the latest
+    ``max_delay`` seconds after the first event of the burst, so a steady
+    stream of events cannot starve the reload.
+    """
+
+    def __init__(self, callback: Callable[[], None], quiet_period: float = 3.0, max_delay: float = 10.0):
+        self.callback = callback
+        self.quiet_period = quiet_period
+        self.max_delay = max_delay
+        self._condition = threading.Condition()
+        self._first_event: Optional[float] = None
+        self._last_event: Optional[float] = None
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name='secrets-reload', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def trigger(self):
+        with self._condition:
+            now = time.monotonic()
+            if self._first_event is None:
+                self._first_event = now
+            self._last_event = now
+            self._condition.notify_all()
+
+    def _wait_for_burst(self) -> bool:
+        with self._condition:
+            while self._first_event is None and not self._stopped:
+                self._condition.wait()
+            while not self._stopped:
+                deadline = min(self._last_event + self.quiet_period, self._first_event + self.max_delay)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            if self._stopped:
+                return False
+            self._first_event = self._last_event = None
+            return True
+
+    def _run(self):
+        while self._wait_for_burst():
+            try:
+                self.callback()
+            except Exception:
+                logging.exception("Secrets reload failed")
+
+
+class FileEventHandler:
+    """Duck-typed watchdog event handler.
+
+    watchdog only calls ``dispatch(event)`` on a handler, so subclasses do not
+    need FileSystemEventHandler and importing a connector does not import
+    watchdog; only ``run()`` does.
+    """
+
+    def dispatch(self, event):
+        for name in ('on_any_event', f"on_{event.event_type}"):
+            handler = getattr(self, name, None)
+            if handler is not None:
+                handler(event)
+
+
+def instance_id() -> str:
+    """Stable name of this process: the pod name in Kubernetes (``HOSTNAME``) plus the pid."""
+    hostname = os.getenv('HOSTNAME')
+    if not hostname:
+        import socket
+        hostname = socket.gethostname()
+    return f"{hostname}:{os.getpid()}"
+
+
+class DeterministicJitter:
+    """Delay each instance by a fixed fraction of ``window`` derived from its id.
+
+    Every instance hashes to the same slot on every rotation, so a fleet
+    reacting to one Secret spreads its reconnects evenly over the window
+    instead of hitting the database within the same few milliseconds.
+    """
+
+    def __init__(self, window: float, instance: Optional[str] = None):
+        self.window = window
+        import hashlib
+        digest = hashlib.sha256((instance or instance_id()).encode()).digest()
+        self.fraction = int.from_bytes(digest[:8], 'big') / 2 ** 64
+
+    def delay(self) -> float:
+        return self.window * self.fraction
+
+
+class TokenBucket:
+    """Allow ``burst`` reconnects at once and ``rate`` per second after that,
+    each one offset by ``jitter``.
+
+    The bucket only limits one process, so on its own every instance of a
+    fleet would take its first token at the same moment. It therefore starts
+    empty, and every delay adds the instance's DeterministicJitter offset
+    (by default over one token interval, ``1 / rate``).
+    """
+
+    def __init__(self, rate: float, burst: int = 1, jitter: Optional[DeterministicJitter] = None):
+        self.rate = rate
+        self.burst = burst
+        self.jitter = jitter or DeterministicJitter(1 / rate)
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def delay(self) -> float:
+        """Take a token and return how long to wait until it is actually available."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+        return wait + self.jitter.delay()
+
+
+def stagger_policy_from_env(environ: Mapping[str, str] = os.environ):
+    """``RECONNECT_RATE`` (per second, with ``RECONNECT_BURST``) selects a token
+    bucket; otherwise ``RECONNECT_STAGGER_WINDOW`` seconds of deterministic jitter
+    (0, the default, reconnects immediately). With both set, the window is the
+    token bucket's jitter."""
+    rate = float(environ.get('RECONNECT_RATE', '0'))
+    window = float(environ.get('RECONNECT_STAGGER_WINDOW', '0'))
+    if rate > 0:
+        return TokenBucket(rate, int(environ.get('RECONNECT_BURST', '1')),
+                           DeterministicJitter(window) if window > 0 else None)
+    return DeterministicJitter(window)
+
+
+class StaggeredCallback:
+    """Run ``callback`` after the delay chosen by ``policy`` instead of right away.
+
+    Only the expensive reaction (e.g. reconnecting to MySQL) is staggered;
+    the loader has already published the new snapshot, so get_credential()
+    returns the new values immediately. Calls that arrive while one is
+    pending are coalesced and the callback runs once with the latest
+    arguments. A zero delay runs the callback inline.
+    """
+
+    def __init__(self, callback: Callable[..., None], policy):
+        self.callback = callback
+        self.policy = policy
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._args: tuple = ()
+
+    def __call__(self, *args):
+        with self._lock:
+            self._args = args
+            if self._timer is not None:
+                return
+            delay = self.policy.delay()
+            if delay > 0:
+                logging.info(f"Staggering reconnect by {delay:.1f}s")
+                self._timer = threading.Timer(delay, self._fire)
+                self._timer.daemon = True
+                self._timer.start()
+                return
+        self._run(args)
+
+    def _fire(self):
+        with self._lock:
+            self._timer = None
+            args = self._args
+        self._run(args)
+
+    def _run(self, args):
+        try:
+            self.callback(*args)
+        except Exception:
+            logging.exception("Staggered callback failed")
+
+    def stop(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
@@ -1,52 +1,499 @@
 # secrets_loader.py
+# Imports only the standard library and this package's stdlib-only modules;
+# hashlib, concurrent.futures, queue and secrets_schema load on first use, so short
+# jobs that only read one credential start fast.
 import os
 import logging
-from typing import List
+import threading
+import time
+from types import MappingProxyType
+from typing import (Callable, Dict, FrozenSet, Iterable, List, Mapping, NamedTuple, Optional, Set,
+                    Tuple, Type, TypeVar)
+
+from secrets_metrics import SecretsMetrics
+from secrets_providers import SecretsProvider
+
+T = TypeVar('T')
+
+# (inode, mtime_ns, size, sha256 digest or None)
+Fingerprint = Tuple[int, int, int, Optional[str]]
+
+
+class SecretsDiff(NamedTuple):
+    """Keys that were added, changed or removed by a reload."""
+    added: Set[str]
+    changed: Set[str]
+    removed: Set[str]
+
+    @property
+    def keys(self) -> Set[str]:
+        return self.added | self.changed | self.removed
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+
+class CredentialsSnapshot(NamedTuple):
+    """An immutable generation of credentials and its version number."""
+    version: int
+    credentials: Mapping[str, str]
+
+
+class ReloadStats(NamedTuple):
+    """Summary of one load_secrets() call."""
+    files_scanned: int
+    files_read: int
+    bytes_read: int
+    changed_keys: int
+    duration: float
+
+
+def redact(value: Optional[str]) -> str:
+    """Describe a secret for log output without revealing it."""
+    if value is None:
+        return '<missing>'
+    return f'<redacted, {len(value)} chars>'
+
+
+class SecretsConsumer(NamedTuple):
+    """A resource that must be rebuilt when any of ``keys`` changes."""
+    keys: FrozenSet[str]
+    callback: Callable[[SecretsDiff], None]
+
+
+class _DaemonThreadPool:
+    """A fixed-size executor whose workers are daemon threads.
+
+    ``concurrent.futures.ThreadPoolExecutor`` joins its workers at interpreter
+    exit, so one ``open()`` hung on a dead network mount would keep the
+    process from ever exiting. A worker stuck here is simply abandoned.
+    """
+
+    def __init__(self, max_workers: int, thread_name_prefix: str):
+        import queue
+        self._queue = queue.SimpleQueue()
+        self._threads = [threading.Thread(target=self._work, name=f'{thread_name_prefix}_{i}', daemon=True)
+                         for i in range(max_workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, fn, args = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def submit(self, fn, *args):
+        from concurrent.futures import Future
+        future = Future()
+        self._queue.put((future, fn, args))
+        return future
+
+    def map(self, fn, iterable) -> list:
+        return [future.result() for future in [self.submit(fn, item) for item in iterable]]
+
+    def shutdown(self):
+        """Cancel queued calls and let every worker exit once its current call returns."""
+        import queue
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[0].cancel()
+        for _ in self._threads:
+            self._queue.put(None)
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class SecretsLoader:
-    def __init__(self, secrets_dirs: List[str], expected_keys: List[str] = []):
+    # Subclasses with an asynchronous load_secrets() defer the first load.
+    load_on_init = True
+
+    def __init__(self, secrets_dirs: List[str], expected_keys: List[str] = [],
+                 incremental: bool = False, content_hash: bool = False,
+                 snapshot: bool = False, metrics: Optional[SecretsMetrics] = None,
+                 max_workers: int = 0, read_timeout: Optional[float] = None,
+                 schemas: Optional[List[type]] = None, providers: Optional[List[SecretsProvider]] = None):
         self.secrets_dirs = secrets_dirs
+        # Extra sources (environment, bundle files, ...) layered over the
+        # directories; later providers override earlier ones.
+        self.providers = list(providers or [])
         self.expected_keys = expected_keys
-        self.credentials = {}
-        self.load_secrets()
-        self.validate_secrets()
-
-    def load_secrets(self):
-        logging.info("Loading secrets...")
-        self.credentials.clear()
-        for dir_path in self.secrets_dirs:
-            if not os.path.isdir(dir_path):
-                logging.warning(f"Directory {dir_path} does not exist or is not accessible.")
+        # Typed configs (see secrets_schema) checked by validate_secrets()
+        self.schemas = list(schemas or [])
+        self._configs: Dict[type, Tuple[CredentialsSnapshot, object]] = {}
+        # In incremental mode only files whose fingerprint moved are re-read.
+        self.incremental = incremental
+        # Also fingerprint file contents, so a rewrite with identical bytes
+        # (e.g. a touch or a no-op rotation) keeps the cached value.
+        self.content_hash = content_hash
+        # Kubernetes-aware mode: read each directory from its resolved ``..data``
+        # generation and ignore the dot-entries the kubelet maintains.
+        self.snapshot = snapshot
+        # For network-backed mounts: scan directories and read files on a
+        # bounded thread pool. A file or directory call that exceeds
+        # ``read_timeout`` keeps its last loaded value instead of stalling.
+        self.max_workers = max_workers
+        self.read_timeout = read_timeout
+        self._read_pool: Optional[_DaemonThreadPool] = None
+        self._dir_pool: Optional[_DaemonThreadPool] = None
+        # Set when a call timed out; its worker may be hung for good, so the
+        # pools are replaced after the reload instead of slowly filling up
+        self._pool_timed_out = False
+        # Copy-on-write: reloads build a new snapshot and swap it in with one
+        # assignment, so readers never take a lock.
+        self._snapshot = CredentialsSnapshot(0, MappingProxyType({}))
+        self._reload_lock = threading.Lock()
+        self._version_changed = threading.Condition()
+        self._entries: Dict[str, Tuple[Fingerprint, str]] = {}
+        self._last_entries: Dict[str, Tuple[Fingerprint, str]] = {}
+        self._dir_entries: Dict[str, Optional[Dict[str, Tuple[Fingerprint, str]]]] = {}
+        self._generations: Dict[str, Tuple[str, Dict[str, Tuple[Fingerprint, str]]]] = {}
+        self._consumers: List[SecretsConsumer] = []
+        # Counters and histograms for every reload; per-file detail is only
+        # logged at DEBUG level.
+        self.metrics = metrics or SecretsMetrics()
+        self.last_reload: Optional[ReloadStats] = None
+        self._load_started = 0.0
+        if self.load_on_init:
+            self.load_secrets()
+            self.validate_secrets()
+
+    def _fingerprint(self, st: os.stat_result, data: Optional[bytes] = None) -> Fingerprint:
+        if data is None:
+            return (st.st_ino, st.st_mtime_ns, st.st_size, None)
+        import hashlib
+        digest = hashlib.sha256(data).hexdigest()
+        return (st.st_ino, st.st_mtime_ns, st.st_size, digest)
+
+    def _read_entry(self, secret_path: str, st: os.stat_result) -> Optional[Tuple[Fingerprint, str]]:
+        previous = self._entries.get(secret_path)
+        if self.incremental and previous is not None and previous[0][:3] == self._fingerprint(st)[:3]:
+            return previous
+        try:
+            with open(secret_path, 'rb') as file:
+                data = file.read()
+            fingerprint = self._fingerprint(st, data if self.content_hash else None)
+            if previous is not None and self.content_hash and previous[0][3] == fingerprint[3]:
+                return fingerprint, previous[1]
+            value = data.decode().strip()
+        except UnicodeDecodeError as e:
+            # The exception text quotes the offending bytes; never log them
+            logging.error(f"Failed to decode secret from {secret_path}: {type(e).__name__}")
+            self.metrics.increment('secrets.read_errors')
+            return None
+        except Exception as e:
+            logging.error(f"Failed to read secret from {secret_path}: {e}")
+            self.metrics.increment('secrets.read_errors')
+            return None
+        logging.debug("Loaded secret from %s", secret_path)
+        return fingerprint, value
+
+    def _resolve_generation(self, dir_path: str) -> str:
+        """Return the directory holding the current generation of ``dir_path``.
+
+        Kubernetes Secret volumes publish each update as a new timestamped
+        directory and atomically swap the ``..data`` symlink to point at it.
+        """
+        data_link = os.path.join(dir_path, '..data')
+        if self.snapshot and os.path.islink(data_link):
+            return os.path.realpath(data_link)
+        return dir_path
+
+    def _list_dir(self, scan_path: str) -> List[str]:
+        return [os.path.join(scan_path, filename) for filename in os.listdir(scan_path)
+                if not (self.snapshot and filename.startswith('.'))]
+
+    def _load_path(self, secret_path: str) -> Optional[Tuple[Fingerprint, str]]:
+        try:
+            st = os.stat(secret_path)
+        except OSError as e:
+            logging.error(f"Failed to read secret from {secret_path}: {e}")
+            return None
+        return self._read_entry(secret_path, st)
+
+    def _call(self, fn, *args):
+        """Run a blocking file system call, bounded by ``read_timeout`` on the pool."""
+        if self._read_pool is None:
+            return fn(*args)
+        return self._read_pool.submit(fn, *args).result(timeout=self.read_timeout)
+
+    def _scan_dir(self, scan_path: str) -> Dict[str, Tuple[Fingerprint, str]]:
+        entries = {}
+        paths = self._call(self._list_dir, scan_path)
+        if self._read_pool is None:
+            for secret_path in paths:
+                entry = self._load_path(secret_path)
+                if entry is not None:
+                    entries[secret_path] = entry
+            return entries
+        from concurrent.futures import wait
+        futures = [(secret_path, self._read_pool.submit(self._load_path, secret_path)) for secret_path in paths]
+        # One deadline for the whole directory, so hung files do not add up
+        wait([future for _, future in futures], timeout=self.read_timeout)
+        for secret_path, future in futures:
+            if future.done():
+                entry = future.result()
+            else:
+                future.cancel()
+                logging.error(f"Timed out reading secret from {secret_path}, keeping the last loaded value.")
+                self.metrics.increment('secrets.read_timeouts')
+                self._pool_timed_out = True
+                entry = self._last_entries.get(secret_path)
+            if entry is not None:
+                entries[secret_path] = entry
+        return entries
+
+    def _load_dir_steps(self, dir_path: str):
+        """Load one directory, shared by the sync and async loaders.
+
+        A generator that performs no I/O itself: it yields ``(fn, path)`` for
+        every blocking call and is sent back the result. ``fn`` is None for
+        "scan this directory", which the driver does with its own scan
+        function. Returns the entries, or None if the directory is missing.
+        """
+        if not (yield os.path.isdir, dir_path):
+            logging.warning(f"Directory {dir_path} does not exist or is not accessible.")
+            self._generations.pop(dir_path, None)
+            return None
+        generation = yield self._resolve_generation, dir_path
+        if generation == dir_path:
+            return (yield None, dir_path)
+        cached = self._generations.get(dir_path)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+        # A swap can land while we read; rescan until the generation holds still.
+        for _ in range(3):
+            entries = yield None, generation
+            resolved = yield self._resolve_generation, dir_path
+            if resolved == generation:
+                break
+            logging.info(f"Generation of {dir_path} changed during load, rescanning.")
+            generation = resolved
+        self._generations[dir_path] = (generation, entries)
+        return entries
+
+    def _load_dir(self, dir_path: str) -> Optional[Dict[str, Tuple[Fingerprint, str]]]:
+        steps = self._load_dir_steps(dir_path)
+        try:
+            fn, path = next(steps)
+            while True:
+                fn, path = steps.send(self._scan_dir(path) if fn is None else self._call(fn, path))
+        except StopIteration as done:
+            return done.value
+
+    def _load_dir_or_keep(self, dir_path: str) -> Optional[Dict[str, Tuple[Fingerprint, str]]]:
+        from concurrent.futures import TimeoutError as FuturesTimeoutError
+        try:
+            return self._load_dir(dir_path)
+        except FuturesTimeoutError:
+            logging.error(f"Timed out scanning {dir_path}, keeping the last loaded secrets.")
+            self.metrics.increment('secrets.read_timeouts')
+            self._pool_timed_out = True
+            return self._dir_entries.get(dir_path)
+
+    def load_secrets(self) -> SecretsDiff:
+        """Load (or reload) all secrets and return the keys that moved.
+
+        Later directories in ``secrets_dirs`` override earlier ones, also when
+        they are loaded concurrently, and ``providers`` override the
+        directories in the same way. The new credentials are published with
+        a single reference assignment, so readers see either the previous
+        snapshot or the new one. The version is bumped only when something
+        changed.
+        """
+        with self._reload_lock:
+            self._begin_load()
+            if not self.max_workers:
+                return self._commit([self._load_dir(dir_path) for dir_path in self.secrets_dirs],
+                                    self._load_providers())
+            if self._read_pool is None:
+                self._read_pool = _DaemonThreadPool(self.max_workers, thread_name_prefix='secrets-read')
+                self._dir_pool = _DaemonThreadPool(min(self.max_workers, max(len(self.secrets_dirs), 1)),
+                                                   thread_name_prefix='secrets-scan')
+            # map() returns results in secrets_dirs order, which keeps the merge deterministic
+            dir_entries = self._dir_pool.map(self._load_dir_or_keep, self.secrets_dirs)
+            if self._pool_timed_out:
+                logging.warning("Replacing the secrets thread pools after a timeout; hung calls are abandoned.")
+                self._shutdown_pools()
+            return self._commit(dir_entries, self._load_providers())
+
+    def close(self):
+        """Shut down the loader's thread pools, if any. Workers still blocked
+        in a hung call are daemon threads and never delay interpreter exit."""
+        self._shutdown_pools()
+
+    def _shutdown_pools(self):
+        for pool in (self._read_pool, self._dir_pool):
+            if pool is not None:
+                pool.shutdown()
+        self._read_pool = self._dir_pool = None
+        self._pool_timed_out = False
+
+    def _begin_load(self):
+        self._load_started = time.perf_counter()
+        if not self.incremental:
+            self._entries = {}
+
+    def _load_providers(self) -> List[Mapping[str, str]]:
+        return [provider.get() for provider in self.providers]
+
+    def _commit(self, dir_entries: List[Optional[Dict[str, Tuple[Fingerprint, str]]]],
+                layers: Optional[List[Mapping[str, str]]] = None) -> SecretsDiff:
+        """Merge per-directory entries in ``secrets_dirs`` order, then the provider layers, and publish them."""
+        entries = {}
+        credentials = {}
+        for loaded in dir_entries:
+            if loaded is None:
                 continue
-            for filename in os.listdir(dir_path):
-                secret_path = os.path.join(dir_path, filename)
-                try:
-                    with open(secret_path, 'r') as file:
-                        self.credentials[filename] = file.read().strip()
-                        logging.info(f"Loaded secret from {secret_path}")
-                except Exception as e:
-                    logging.error(f"Failed to read secret from {secret_path}: {e}")
+            entries.update(loaded)
+            for secret_path, entry in loaded.items():
+                credentials[os.path.basename(secret_path)] = entry[1]
+        for layer in layers or ():
+            credentials.update(layer)
+
+        files_read = bytes_read = 0
+        for secret_path, entry in entries.items():
+            if self._entries.get(secret_path) is not entry:
+                files_read += 1
+                bytes_read += entry[0][2]
+        self._entries = self._last_entries = entries
+        self._dir_entries = dict(zip(self.secrets_dirs, dir_entries))
+        diff = self._swap(credentials)
+        self._record_reload(ReloadStats(len(entries), files_read, bytes_read, len(diff.keys),
+                                        time.perf_counter() - self._load_started), diff)
+        return diff
+
+    def _record_reload(self, stats: ReloadStats, diff: SecretsDiff):
+        self.last_reload = stats
+        self.metrics.increment('secrets.reloads')
+        self.metrics.increment('secrets.files_read', stats.files_read)
+        self.metrics.increment('secrets.bytes_read', stats.bytes_read)
+        self.metrics.increment('secrets.keys_changed', stats.changed_keys)
+        self.metrics.observe('secrets.reload_seconds', stats.duration)
+        # No-op reloads (polling, unrelated events) are only worth a DEBUG line
+        logging.log(logging.INFO if diff else logging.DEBUG,
+                    "Reloaded secrets: %d files scanned, %d read (%d bytes), %d keys changed %s in %.1f ms",
+                    stats.files_scanned, stats.files_read, stats.bytes_read, stats.changed_keys,
+                    sorted(diff.keys)[:10], stats.duration * 1000)
+
+    def _swap(self, credentials: Dict[str, str]) -> SecretsDiff:
+        """Publish ``credentials`` as the next snapshot if any key moved."""
+        previous = self._snapshot
+        diff = SecretsDiff(
+            added={key for key in credentials if key not in previous.credentials},
+            changed={key for key in credentials
+                     if key in previous.credentials and previous.credentials[key] != credentials[key]},
+            removed={key for key in previous.credentials if key not in credentials},
+        )
+        if diff:
+            self._publish(CredentialsSnapshot(previous.version + 1, MappingProxyType(credentials)))
+            self._notify_consumers(diff)
+        return diff
+
+    def register_consumer(self, keys: Iterable[str], callback: Callable[[SecretsDiff], None]) -> SecretsConsumer:
+        """Call ``callback(diff)`` after every reload that changes one of ``keys``.
+
+        Callbacks run on the reloading thread once the new snapshot is
+        published; they must not call ``load_secrets()`` themselves.
+        """
+        consumer = SecretsConsumer(frozenset(keys), callback)
+        self._consumers = self._consumers + [consumer]
+        return consumer
+
+    def unregister_consumer(self, consumer: SecretsConsumer):
+        self._consumers = [registered for registered in self._consumers if registered is not consumer]
+
+    def _notify_consumers(self, diff: SecretsDiff):
+        changed = diff.keys
+        for consumer in self._consumers:
+            if consumer.keys.isdisjoint(changed):
+                continue
+            try:
+                consumer.callback(diff)
+            except Exception:
+                logging.exception("Secrets consumer failed to rebuild")
+
+    def _publish(self, snapshot: CredentialsSnapshot):
+        self._snapshot = snapshot
+        with self._version_changed:
+            self._version_changed.notify_all()
+
+    @property
+    def credentials(self) -> Mapping[str, str]:
+        return self._snapshot.credentials
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def get_snapshot(self) -> CredentialsSnapshot:
+        """Return the current generation; its version and values always agree."""
+        return self._snapshot
+
+    def wait_for_version(self, version: int, timeout: Optional[float] = None) -> Optional[CredentialsSnapshot]:
+        """Block until a snapshot with at least ``version`` is published.
+
+        Returns that snapshot, or None if ``timeout`` expires first.
+        """
+        with self._version_changed:
+            if not self._version_changed.wait_for(lambda: self._snapshot.version >= version, timeout):
+                return None
+            return self._snapshot
 
     def validate_secrets(self):
         missing_keys = [key for key in self.expected_keys if key not in self.credentials]
         if missing_keys:
             logging.warning(f"Missing expected secrets: {', '.join(missing_keys)}")
-        else:
+        invalid = False
+        if self.schemas:
+            from secrets_schema import SecretsConfigError
+        for schema in self.schemas:
+            try:
+                self.get_config(schema)
+            except SecretsConfigError as e:
+                logging.warning(f"Invalid secrets: {e}")
+                invalid = True
+        if not missing_keys and not invalid:
             logging.info("All expected secrets loaded successfully.")
 
+    def get_config(self, config: Type[T]) -> T:
+        """Return ``config`` parsed from the current snapshot.
+
+        Parsing and validation happen once per snapshot; later calls return
+        the cached frozen object. Raises SecretsConfigError if required keys
+        are missing or values do not parse.
+        """
+        snapshot = self._snapshot
+        cached = self._configs.get(config)
+        if cached is not None and cached[0] is snapshot:
+            return cached[1]
+        from secrets_schema import parse_config
+        parsed = parse_config(config, snapshot.credentials)
+        self._configs[config] = (snapshot, parsed)
+        return parsed
+
     def get_credential(self, key: str) -> str:
-        return self.credentials.get(key)
+        return self._snapshot.credentials.get(key)
 
 # Example usage:
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     secrets_dirs = ['/path/to/db-secrets', '/path/to/token-secrets']  # Update these paths as needed
     expected_keys = ['MYSQL_HOSTNAME', 'MYSQL_USERNAME', 'MYSQL_PASSWORD', 'MYSQL_DB', 'MYSQL_PORT']
     loader = SecretsLoader(secrets_dirs=secrets_dirs, expected_keys=expected_keys)
-    
+
     # Demonstrate retrieving a non-sensitive credential for testing purposes
     hostname = loader.get_credential('MYSQL_HOSTNAME')
     print(f"MYSQL_HOSTNAME: {hostname}")
     # Note: Be cautious about printing sensitive information like passwords in a real environment.
-
@@ -0,0 +1,55 @@
+# secrets_metrics.py
+import threading
+from typing import Dict, List, Sequence
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float('inf'))
+
+
+class SecretsMetrics:
+    """Metrics hook used by SecretsLoader; the default implementation does nothing.
+
+    Subclass it to forward counters and histogram samples to Prometheus,
+    StatsD or similar. Methods may be called from several threads.
+    """
+
+    def increment(self, name: str, value: int = 1):
+        pass
+
+    def observe(self, name: str, value: float):
+        pass
+
+
+class InMemoryMetrics(SecretsMetrics):
+    """Keep counters and bucketed histograms in process, e.g. for a /metrics view."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counters: Dict[str, int] = {}
+        self.histograms: Dict[str, Dict[str, object]] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = {'count': 0, 'sum': 0.0, 'buckets': [0] * len(self.buckets)}
+            histogram['count'] += 1
+            histogram['sum'] += value
+            counts: List[int] = histogram['buckets']
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                'counters': dict(self.counters),
+                'histograms': {name: {'count': h['count'], 'sum': h['sum'],
+                                      'buckets': dict(zip(map(str, self.buckets), h['buckets']))}
+                               for name, h in self.histograms.items()},
+            }
@@ -0,0 +1,227 @@
+# secrets_providers.py
+import os
+import abc
+import json
+import time
+import logging
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+# (inode, mtime_ns, size)
+StatKey = Tuple[int, int, int]
+
+
+class SecretsProvider(abc.ABC):
+    """A source of secrets layered on top of the directories of a SecretsLoader.
+
+    Subclasses implement ``load()``. ``get()`` caches its result for ``ttl``
+    seconds, so a reload triggered by one directory does not hit every other
+    source again. If ``load()`` fails, the last good values are kept.
+    """
+
+    def __init__(self, ttl: float = 0.0):
+        self.ttl = ttl
+        self._values: Optional[Dict[str, str]] = None
+        self._loaded_at = 0.0
+
+    @property
+    def name(self) -> str:
+        return type(self).__name__
+
+    @abc.abstractmethod
+    def load(self) -> Dict[str, str]:
+        """Return the current values; raising keeps the last good ones."""
+
+    def get(self) -> Mapping[str, str]:
+        now = time.monotonic()
+        if self._values is not None and now - self._loaded_at < self.ttl:
+            return self._values
+        try:
+            values = self.load()
+        except UnicodeDecodeError as e:
+            logging.error(f"Failed to decode secrets from {self.name}: {type(e).__name__}")
+            return self._values or {}
+        except Exception as e:
+            logging.error(f"Failed to load secrets from {self.name}: {e}")
+            return self._values or {}
+        self._values = values
+        self._loaded_at = now
+        return values
+
+
+class DirectoryProvider(SecretsProvider):
+    """One secrets directory, read with a SecretsLoader of its own.
+
+    Use it instead of ``secrets_dirs`` to place a directory anywhere in the
+    precedence order. ``options`` are passed to the SecretsLoader (e.g.
+    ``incremental=True, snapshot=True``).
+    """
+
+    def __init__(self, path: str, ttl: float = 0.0, **options):
+        super().__init__(ttl)
+        self.path = path
+        self.options = options
+        self._loader = None
+
+    @property
+    def name(self) -> str:
+        return self.path
+
+    def load(self) -> Dict[str, str]:
+        if self._loader is None:
+            from secrets_loader import SecretsLoader
+            self._loader = SecretsLoader([self.path], **self.options)
+        else:
+            self._loader.load_secrets()
+        return dict(self._loader.credentials)
+
+
+class EnvironmentProvider(SecretsProvider):
+    """Environment variables starting with ``prefix``, with the prefix removed.
+
+    ``keys`` limits the provider to those names (after removing the prefix).
+    An empty prefix without ``keys`` would load the whole environment and is
+    rejected.
+    """
+
+    def __init__(self, prefix: str = '', keys: Optional[Iterable[str]] = None, ttl: float = 0.0,
+                 environ: Mapping[str, str] = os.environ):
+        if not prefix and keys is None:
+            raise ValueError("EnvironmentProvider needs a prefix or an explicit list of keys")
+        super().__init__(ttl)
+        self.prefix = prefix
+        self.keys = frozenset(keys) if keys is not None else None
+        self.environ = environ
+
+    @property
+    def name(self) -> str:
+        return f"environment ({self.prefix}*)" if self.prefix else "environment"
+
+    def load(self) -> Dict[str, str]:
+        values = {}
+        for name, value in self.environ.items():
+            if not name.startswith(self.prefix):
+                continue
+            key = name[len(self.prefix):]
+            if key and (self.keys is None or key in self.keys):
+                values[key] = value
+        return values
+
+
+def parse_dotenv(text: str) -> Dict[str, str]:
+    """Parse ``KEY=VALUE`` lines; blank lines, ``#`` comments and ``export`` are ignored."""
+    values = {}
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('export '):
+            line = line[len('export '):].lstrip()
+        key, sep, value = line.partition('=')
+        if not sep or not key.strip():
+            raise ValueError(f"line {number} is not KEY=VALUE")
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+            value = value[1:-1]
+        values[key.strip()] = value
+    return values
+
+
+def parse_json_bundle(text: str) -> Dict[str, str]:
+    """Parse a flat JSON object; numbers and booleans are converted to strings."""
+    document = json.loads(text)
+    if not isinstance(document, dict):
+        raise ValueError("JSON bundle must be an object")
+    values = {}
+    for key, value in document.items():
+        if isinstance(value, (dict, list)) or value is None:
+            raise ValueError(f"{key} must be a string, number or boolean")
+        values[key] = json.dumps(value) if isinstance(value, bool) else str(value)
+    return values
+
+
+class BundleFileProvider(SecretsProvider):
+    """All secrets from one dotenv or JSON file, read in a single call.
+
+    The format follows the extension (``.json``, anything else is dotenv)
+    unless ``format`` is given. The file is only read again when its inode,
+    mtime or size changes.
+    """
+
+    def __init__(self, path: str, format: Optional[str] = None, ttl: float = 0.0):
+        super().__init__(ttl)
+        self.path = path
+        self.format = format or self._format_of(path)
+        self._stat_key: Optional[StatKey] = None
+        self._bundle: Dict[str, str] = {}
+
+    @staticmethod
+    def _format_of(path: str) -> str:
+        return 'json' if path.endswith('.json') else 'dotenv'
+
+    @property
+    def name(self) -> str:
+        return self.path
+
+    def decode(self, data: bytes) -> str:
+        return data.decode()
+
+    def load(self) -> Dict[str, str]:
+        with open(self.path, 'rb') as file:
+            st = os.fstat(file.fileno())
+            stat_key = (st.st_ino, st.st_mtime_ns, st.st_size)
+            if stat_key == self._stat_key:
+                return self._bundle
+            data = file.read()
+        text = self.decode(data)
+        self._bundle = parse_json_bundle(text) if self.format == 'json' else parse_dotenv(text)
+        self._stat_key = stat_key
+        logging.debug("Loaded %d secrets from %s", len(self._bundle), self.path)
+        return self._bundle
+
+
+class EncryptedBundleProvider(BundleFileProvider):
+    """A bundle file encrypted with Fernet (``pip3 install cryptography``).
+
+    ``key`` is the Fernet key; it defaults to the ``SECRETS_BUNDLE_KEY``
+    environment variable. The format follows the extension without a
+    trailing ``.enc`` (``secrets.json.enc`` is JSON).
+    """
+
+    def __init__(self, path: str, key: Union[str, bytes, None] = None, format: Optional[str] = None,
+                 ttl: float = 0.0):
+        super().__init__(path, format or self._format_of(path[:-len('.enc')] if path.endswith('.enc') else path), ttl)
+        key = key or os.getenv('SECRETS_BUNDLE_KEY')
+        if not key:
+            raise ValueError("EncryptedBundleProvider needs a key or SECRETS_BUNDLE_KEY")
+        self._key = key.encode() if isinstance(key, str) else key
+        self._fernet = None
+
+    def decode(self, data: bytes) -> str:
+        if self._fernet is None:
+            from cryptography.fernet import Fernet
+            self._fernet = Fernet(self._key)
+        return self._fernet.decrypt(data).decode()
+
+
+def providers_from_env(environ: Mapping[str, str] = os.environ) -> List[SecretsProvider]:
+    """Providers configured by ``SECRETS_BUNDLE`` (plain or, ending in ``.enc``,
+    encrypted bundle file) and ``SECRETS_ENV_PREFIX`` (optionally limited to the
+    comma-separated ``SECRETS_ENV_KEYS``), cached for ``SECRETS_PROVIDER_TTL``
+    seconds. Environment variables take precedence."""
+    ttl = float(environ.get('SECRETS_PROVIDER_TTL', '0'))
+    providers = []
+    bundle = environ.get('SECRETS_BUNDLE')
+    if bundle:
+        if bundle.endswith('.enc'):
+            providers.append(EncryptedBundleProvider(bundle, environ.get('SECRETS_BUNDLE_KEY'), ttl=ttl))
+        else:
+            providers.append(BundleFileProvider(bundle, ttl=ttl))
+    if 'SECRETS_ENV_PREFIX' in environ:
+        prefix = environ['SECRETS_ENV_PREFIX']
+        keys = [key.strip() for key in environ['SECRETS_ENV_KEYS'].split(',') if key.strip()] \
+            if 'SECRETS_ENV_KEYS' in environ else None
+        if not prefix and not keys:
+            raise ValueError("SECRETS_ENV_PREFIX is empty, which would load the whole environment; "
+                             "set a prefix or list the keys in SECRETS_ENV_KEYS")
+        providers.append(EnvironmentProvider(prefix, keys, ttl=ttl, environ=environ))
+    return providers
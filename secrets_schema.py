@@ -0,0 +1,104 @@
+# secrets_schema.py
+import dataclasses
+from functools import cached_property
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Type, TypeVar
+
+T = TypeVar('T')
+
+_TRUE = {'1', 'true', 'yes', 'on'}
+_FALSE = {'0', 'false', 'no', 'off'}
+
+
+class SecretsConfigError(ValueError):
+    """Secrets are missing or cannot be parsed into the declared config."""
+
+    def __init__(self, config: type, missing: List[str], invalid: Dict[str, str]):
+        self.missing = missing
+        self.invalid = invalid
+        problems = []
+        if missing:
+            problems.append(f"missing {', '.join(missing)}")
+        if invalid:
+            problems.append(', '.join(f"invalid {key} ({reason})" for key, reason in invalid.items()))
+        super().__init__(f"{config.__name__}: {'; '.join(problems)}")
+
+
+def _parse_bool(value: str) -> bool:
+    lowered = value.lower()
+    if lowered in _TRUE:
+        return True
+    if lowered in _FALSE:
+        return False
+    raise ValueError(f"not a boolean: expected one of {sorted(_TRUE | _FALSE)}")
+
+
+_PARSERS: Dict[Any, Callable[[str], Any]] = {
+    str: str,
+    int: int,
+    float: float,
+    bool: _parse_bool,
+    bytes: str.encode,
+}
+
+
+def secret(key: str, default: Any = dataclasses.MISSING, parse: Optional[Callable[[str], Any]] = None):
+    """Declare a config field read from the secret ``key``.
+
+    Fields without a default are required. The value is converted with
+    ``parse`` or, by default, according to the field's annotation.
+    """
+    return dataclasses.field(default=default, metadata={'secret': key, 'parse': parse})
+
+
+def required_keys(config: type) -> List[str]:
+    return [field.metadata['secret'] for field in dataclasses.fields(config)
+            if 'secret' in field.metadata and field.default is dataclasses.MISSING]
+
+
+def parse_config(config: Type[T], credentials: Mapping[str, str]) -> T:
+    """Build a frozen ``config`` instance from ``credentials`` or raise SecretsConfigError."""
+    values = {}
+    missing = []
+    invalid = {}
+    for field in dataclasses.fields(config):
+        key = field.metadata.get('secret')
+        if key is None:
+            continue
+        try:
+            raw = credentials.get(key)
+        except ValueError as e:
+            # e.g. a binary value in a SecureSecretsLoader snapshot
+            invalid[key] = str(e)
+            continue
+        if raw is None:
+            if field.default is dataclasses.MISSING:
+                missing.append(key)
+            continue
+        parse = field.metadata['parse'] or _PARSERS.get(field.type, str)
+        try:
+            values[field.name] = parse(raw)
+        except (TypeError, ValueError) as e:
+            # The parser's message may quote the value (e.g. int('hunter2')); keep it out of the logs
+            invalid[key] = f"expected {getattr(field.type, '__name__', field.type)}, {type(e).__name__}"
+    if missing or invalid:
+        raise SecretsConfigError(config, missing, invalid)
+    return config(**values)
+
+
+@dataclasses.dataclass(frozen=True)
+class MySQLConfig:
+    host: str = secret('MYSQL_HOSTNAME')
+    user: str = secret('MYSQL_USERNAME')
+    password: str = secret('MYSQL_PASSWORD')
+    database: str = secret('MYSQL_DB')
+    port: int = secret('MYSQL_PORT', default=3306)
+
+    @cached_property
+    def connect_args(self) -> Mapping[str, Any]:
+        """Keyword arguments for ``mysql.connector.connect``; read-only, since
+        every caller of the same snapshot shares this mapping."""
+        return MappingProxyType(dataclasses.asdict(self))
+
+    def __repr__(self):
+        return f"MySQLConfig(host={self.host!r}, user={self.user!r}, database={self.database!r}, port={self.port})"
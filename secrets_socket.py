@@ -0,0 +1,191 @@
+# secrets_socket.py
+import os
+import json
+import math
+import uuid
+import socket
+import stat
+import logging
+import threading
+import socketserver
+from typing import List, Optional, Tuple
+
+from secrets_loader import SecretsDiff, SecretsLoader
+
+# Newline-delimited JSON over a Unix stream socket. A client sends
+#   {"since": <version>, "server": <id>, "wait": <seconds>}
+# and the server answers as soon as it holds a newer version, or after
+# ``wait`` seconds, with
+#   {"server": <id>, "version": <version>, "credentials": {...}}
+# where "credentials" is only present when the version is newer than "since".
+# The server id changes on restart, so clients never wait on a stale version.
+DEFAULT_WAIT = 30.0
+
+
+def _parse_request(request, server_id: str) -> Tuple[int, float]:
+    """Return (since, wait) from a client request; raises TypeError or ValueError if it is malformed."""
+    if not isinstance(request, dict):
+        raise TypeError("request must be a JSON object")
+    since = request.get('since', 0)
+    if isinstance(since, bool) or not isinstance(since, int) or since < 0:
+        raise ValueError("since must be a non-negative integer")
+    if request.get('server') != server_id:
+        since = 0  # A version from another server instance means nothing here
+    wait = request.get('wait', DEFAULT_WAIT)
+    if isinstance(wait, bool) or not isinstance(wait, (int, float)) or not math.isfinite(wait) or wait < 0:
+        raise ValueError("wait must be a non-negative number")
+    return since, min(float(wait), DEFAULT_WAIT)
+
+
+class _SubscriptionHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server = self.server
+        for line in self.rfile:
+            try:
+                since, wait = _parse_request(json.loads(line), server.server_id)
+            except (TypeError, ValueError) as e:
+                logging.warning(f"Dropping malformed secrets subscription request: {e}")
+                return
+            snapshot = server.secrets_loader.wait_for_version(since + 1, timeout=wait)
+            response = {'server': server.server_id, 'version': server.secrets_loader.version}
+            if snapshot is not None:
+                response['version'] = snapshot.version
+                response['credentials'] = dict(snapshot.credentials)
+            self.wfile.write(json.dumps(response).encode() + b'\n')
+            self.wfile.flush()
+
+
+class SecretsServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Publish the snapshots of one SecretsLoader to local subscribers."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, secrets_loader: SecretsLoader):
+        self.socket_path = socket_path
+        self.secrets_loader = secrets_loader
+        self.server_id = uuid.uuid4().hex
+        try:
+            mode = os.lstat(socket_path).st_mode
+        except FileNotFoundError:
+            pass
+        else:
+            # Replace a stale socket from an earlier run, but never anything else
+            if not stat.S_ISSOCK(mode):
+                raise FileExistsError(f"{socket_path} exists and is not a socket")
+            os.unlink(socket_path)
+        super().__init__(socket_path, _SubscriptionHandler)
+        self._thread: Optional[threading.Thread] = None
+
+    def server_bind(self):
+        super().server_bind()
+        # Only the owning user may connect: the socket hands out plaintext
+        # secrets. Nobody can connect before listen(), which runs after this.
+        os.chmod(self.socket_path, 0o600)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name='secrets-server', daemon=True)
+        self._thread.start()
+        logging.info(f"Serving secrets on {self.socket_path}")
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+class SocketSecretsLoader(SecretsLoader):
+    """SecretsLoader that subscribes to a SecretsServer instead of reading files.
+
+    The initial snapshot is fetched at construction. A background thread then
+    long-polls the server and only receives credentials on a version bump;
+    ``close()`` ends it.
+    """
+
+    load_on_init = False
+
+    def __init__(self, socket_path: str, expected_keys: List[str] = [], wait: float = DEFAULT_WAIT,
+                 subscribe: bool = True):
+        super().__init__([], expected_keys)
+        self.socket_path = socket_path
+        self.wait = wait
+        self._server_id = None
+        self._server_version = 0
+        self._closed = threading.Event()
+        self._sock: Optional[socket.socket] = None
+        self._sock_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.load_secrets()
+        self.validate_secrets()
+        if subscribe:
+            self._thread = threading.Thread(target=self._subscribe, name='secrets-subscriber', daemon=True)
+            self._thread.start()
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.socket_path)
+        return sock, sock.makefile('rwb')
+
+    def _request(self, stream, since: int, wait: float) -> dict:
+        request = {'since': since, 'server': self._server_id, 'wait': wait}
+        stream.write(json.dumps(request).encode() + b'\n')
+        stream.flush()
+        line = stream.readline()
+        if not line:
+            raise ConnectionError("Secrets server closed the connection")
+        return json.loads(line)
+
+    def _apply(self, response: dict) -> SecretsDiff:
+        with self._reload_lock:
+            self._server_id = response['server']
+            self._server_version = response['version']
+            if 'credentials' not in response:
+                return SecretsDiff(set(), set(), set())
+            return self._swap(response['credentials'])
+
+    def load_secrets(self) -> SecretsDiff:
+        """Fetch the server's current snapshot without waiting."""
+        try:
+            sock, stream = self._connect()
+            with sock, stream:
+                return self._apply(self._request(stream, 0, 0))
+        except (OSError, ValueError) as e:
+            logging.error(f"Failed to fetch secrets from {self.socket_path}: {e}")
+            return SecretsDiff(set(), set(), set())
+
+    def _subscribe(self):
+        while not self._closed.is_set():
+            try:
+                sock, stream = self._connect()
+                with self._sock_lock:
+                    if self._closed.is_set():
+                        sock.close()
+                        return
+                    self._sock = sock
+                with sock, stream:
+                    while True:
+                        diff = self._apply(self._request(stream, self._server_version, self.wait))
+                        if diff:
+                            logging.info(f"Secrets updated to server version {self._server_version}.")
+            except (OSError, ValueError) as e:
+                if self._closed.is_set():
+                    return
+                logging.warning(f"Secrets subscription to {self.socket_path} failed: {e}")
+                self._closed.wait(1.0)
+            finally:
+                with self._sock_lock:
+                    self._sock = None
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Stop the subscription thread and close its connection."""
+        self._closed.set()
+        with self._sock_lock:
+            if self._sock is not None:
+                try:
+                    # Wakes the thread blocked in readline()
+                    self._sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        super().close()
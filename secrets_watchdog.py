@@ -1,25 +1,36 @@
 # secrets_watchdog.py
+import os
 import time
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+import logging
 from secrets_loader import SecretsLoader  # Adjust the import path as needed
+from secrets_socket import SecretsServer
+from reload_scheduler import FileEventHandler
 
-class SecretsUpdateHandler(FileSystemEventHandler):
+class SecretsUpdateHandler(FileEventHandler):
     def __init__(self, secrets_loader):
         self.secrets_loader = secrets_loader
 
     def on_any_event(self, event):
         if not event.is_directory:
             print(f"Detected {event.event_type} event - {event.src_path}. Reloading secrets...")
-            self.secrets_loader.load_secrets()
-            self.secrets_loader.validate_secrets()  # Validates and logs the loaded secrets
+            diff = self.secrets_loader.load_secrets()
+            if diff:
+                print(f"Secrets changed: {', '.join(sorted(diff.keys))}")
+                self.secrets_loader.validate_secrets()  # Validates and logs the loaded secrets
 
 class SecretsWatchdog:
     def __init__(self, secrets_dirs, expected_keys):
-        self.secrets_loader = SecretsLoader(secrets_dirs=secrets_dirs, expected_keys=expected_keys)
+        self.secrets_loader = SecretsLoader(secrets_dirs=secrets_dirs, expected_keys=expected_keys, incremental=True)
+        from watchdog.observers import Observer
         self.observer = Observer()
 
-    def run(self):
+    def run(self, socket_path=None):
+        # Sidecar mode: serve snapshots to SocketSecretsLoader clients so the
+        # workers on this host share one observer and one set of reads.
+        server = None
+        if socket_path:
+            server = SecretsServer(socket_path, self.secrets_loader)
+            server.start()
         event_handler = SecretsUpdateHandler(self.secrets_loader)
         for dir_path in self.secrets_loader.secrets_dirs:
             self.observer.schedule(event_handler, dir_path, recursive=True)
@@ -32,11 +43,15 @@ class SecretsWatchdog:
             self.observer.stop()
             print("Observer stopped.")
         self.observer.join()
+        if server is not None:
+            server.stop()
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     #secrets_dirs = ['/path/to/db-secrets', '/path/to/token-secrets']  # Update with your directories
     secrets_dirs = ['./local_watch/db-secrets', './local_watch/token-secrets'] 
-    expected_keys = ['MYSQL_HOSTNAME', 'MYSQL_USERNAME', 'MYSQL_PASSWORD', 'MYSQL_DB', 'MYSQL_PORT']
+    from secrets_schema import MySQLConfig, required_keys
+    expected_keys = required_keys(MySQLConfig)
     watchdog = SecretsWatchdog(secrets_dirs=secrets_dirs, expected_keys=expected_keys)
-    watchdog.run()
+    watchdog.run(socket_path=os.getenv('SECRETS_SOCKET'))
 
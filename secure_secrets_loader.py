@@ -0,0 +1,245 @@
+# secure_secrets_loader.py
+import os
+import hmac
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Mapping, Optional, Tuple, Type, TypeVar
+
+from secrets_loader import Fingerprint, SecretsDiff, SecretsLoader
+
+T = TypeVar('T')
+
+_WHITESPACE = b' \t\n\r\x0b\x0c'
+
+
+class SecretRetiredError(RuntimeError):
+    """The value was wiped because its snapshot was retired."""
+
+
+class SecureValue:
+    """One secret held in a mutable buffer that is zeroed when it is retired.
+
+    The bytes are only reachable through ``open()``, which yields a
+    read-only memoryview. A value retired while views are open is wiped when
+    the last one is closed.
+    """
+
+    __slots__ = ('_buffer', '_start', '_end', '_users', '_retired', '_lock')
+
+    def __init__(self, buffer: bytearray, start: int, end: int):
+        self._buffer = buffer
+        self._start = start
+        self._end = end
+        self._users = 0
+        self._retired = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def __repr__(self) -> str:
+        state = 'wiped' if self._retired and not self._users else f'{len(self)} bytes'
+        return f'<SecureValue, {state}>'
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, SecureValue):
+            return NotImplemented
+        with self.open() as mine, other.open() as theirs:
+            return hmac.compare_digest(mine, theirs)
+
+    __hash__ = None
+
+    def acquire(self) -> memoryview:
+        """Return a read-only view; every acquire() needs a matching release()."""
+        with self._lock:
+            if self._retired:
+                raise SecretRetiredError("secret value has been retired")
+            self._users += 1
+        return memoryview(self._buffer)[self._start:self._end].toreadonly()
+
+    def release(self, view: memoryview):
+        view.release()
+        with self._lock:
+            self._users -= 1
+            if self._retired and not self._users:
+                self._wipe()
+
+    @contextmanager
+    def open(self) -> Iterator[memoryview]:
+        view = self.acquire()
+        try:
+            yield view
+        finally:
+            self.release(view)
+
+    def decode(self) -> str:
+        """Return the value as a ``str``; the copy cannot be wiped."""
+        with self.open() as view:
+            return str(view, 'utf-8')
+
+    def retire(self):
+        with self._lock:
+            if self._retired:
+                return
+            self._retired = True
+            if not self._users:
+                self._wipe()
+
+    def _wipe(self):
+        # Same-size slice assignment overwrites the buffer in place
+        self._buffer[:] = bytes(len(self._buffer))
+
+
+def read_secure(path: str) -> Tuple[os.stat_result, bytearray, int]:
+    """Read ``path`` straight into a bytearray sized from ``fstat``, without an
+    intermediate ``bytes``. Returns the buffer and how much of it was filled."""
+    with open(path, 'rb', buffering=0) as file:
+        st = os.fstat(file.fileno())
+        buffer = bytearray(st.st_size)
+        view = memoryview(buffer)
+        filled = 0
+        while filled < len(buffer):
+            read = file.readinto(view[filled:])
+            if not read:
+                break
+            filled += read
+        view.release()
+    # Never shrink the buffer: a reallocation could leave a copy behind
+    return st, buffer, filled
+
+
+def _strip_bounds(buffer: bytearray, end: int) -> Tuple[int, int]:
+    start = 0
+    while start < end and buffer[start] in _WHITESPACE:
+        start += 1
+    while end > start and buffer[end - 1] in _WHITESPACE:
+        end -= 1
+    return start, end
+
+
+class _DecodedCredentials(Mapping):
+    """str view over a secure snapshot for parse_config; decodes only the keys it asks for."""
+
+    def __init__(self, credentials: Mapping[str, SecureValue]):
+        self._credentials = credentials
+
+    def __getitem__(self, key: str) -> str:
+        try:
+            return self._credentials[key].decode()
+        except UnicodeDecodeError as e:
+            # The exception text quotes the offending byte; report the type only
+            raise ValueError(f"not valid UTF-8 ({type(e).__name__})") from None
+
+    def __iter__(self):
+        return iter(self._credentials)
+
+    def __len__(self) -> int:
+        return len(self._credentials)
+
+
+class SecureSecretsLoader(SecretsLoader):
+    """SecretsLoader that keeps values in wipeable buffers instead of ``str``.
+
+    Files are read with ``readinto`` into a ``bytearray``; surrounding
+    whitespace is skipped by offset rather than copied away. When a reload
+    replaces or drops a value and no snapshot, cache or open reader still
+    refers to it, its buffer is zeroed. Read values through ``secret()``:
+
+        with loader.secret('MYSQL_PASSWORD') as password:
+            ...  # a read-only memoryview, valid inside the block
+
+    ``get_credential()`` and ``get_config()`` still work but return ``str``
+    copies that outlive the rotation; keep them for APIs that need ``str``.
+    """
+
+    def __init__(self, *args, **options):
+        if options.get('providers'):
+            raise ValueError("SecureSecretsLoader only reads directories; use SecretsLoader for providers")
+        # Every value handed out and not yet wiped, by id
+        self._tracked: Dict[int, SecureValue] = {}
+        super().__init__(*args, **options)
+
+    def _read_entry(self, secret_path: str, st: os.stat_result) -> Optional[Tuple[Fingerprint, SecureValue]]:
+        previous = self._entries.get(secret_path)
+        if self.incremental and previous is not None and previous[0][:3] == self._fingerprint(st)[:3]:
+            return previous
+        try:
+            st, buffer, filled = read_secure(secret_path)
+            start, end = _strip_bounds(buffer, filled)
+            value = SecureValue(buffer, start, end)
+            fingerprint = self._fingerprint(st, memoryview(buffer)[:filled] if self.content_hash else None)
+            if previous is not None and self.content_hash and previous[0][3] == fingerprint[3]:
+                value.retire()
+                return fingerprint, previous[1]
+        except Exception as e:
+            logging.error(f"Failed to read secret from {secret_path}: {e}")
+            self.metrics.increment('secrets.read_errors')
+            return None
+        logging.debug("Loaded secret from %s", secret_path)
+        return fingerprint, value
+
+    def _commit(self, dir_entries, layers=None) -> SecretsDiff:
+        diff = super()._commit(dir_entries, layers)
+        self._retire_unreferenced()
+        return diff
+
+    def _retire_unreferenced(self):
+        """Wipe every value that no snapshot or cache of this loader refers to any more."""
+        referenced = {id(value): value for value in self._snapshot.credentials.values()}
+        caches = [self._entries, self._last_entries, *self._dir_entries.values(),
+                  *(entries for _, entries in self._generations.values())]
+        for entries in caches:
+            for _, value in (entries or {}).values():
+                referenced[id(value)] = value
+        for key, value in self._tracked.items():
+            if key not in referenced:
+                value.retire()
+        self._tracked = referenced
+
+    def close(self):
+        """Shut down the thread pools and wipe every value."""
+        super().close()
+        with self._reload_lock:
+            for value in self._tracked.values():
+                value.retire()
+            self._tracked = {}
+
+    @contextmanager
+    def secret(self, key: str) -> Iterator[Optional[memoryview]]:
+        """Yield a read-only view of ``key`` from the current snapshot, or None if it is missing."""
+        for _ in range(3):
+            value = self._snapshot.credentials.get(key)
+            if value is None:
+                yield None
+                return
+            try:
+                view = value.acquire()
+            except SecretRetiredError:
+                continue  # Rotated between lookup and acquire; the new snapshot is already published
+            try:
+                yield view
+            finally:
+                value.release(view)
+            return
+        raise SecretRetiredError(f"{key} kept rotating while it was being opened")
+
+    def get_credential(self, key: str) -> Optional[str]:
+        with self.secret(key) as view:
+            if view is None:
+                return None
+            try:
+                return str(view, 'utf-8')
+            except UnicodeDecodeError as e:
+                logging.error(f"Failed to decode secret {key}: {type(e).__name__}; use secret() instead.")
+                return None
+
+    def get_config(self, config: Type[T]) -> T:
+        snapshot = self._snapshot
+        cached = self._configs.get(config)
+        if cached is not None and cached[0] is snapshot:
+            return cached[1]
+        from secrets_schema import parse_config
+        parsed = parse_config(config, _DecodedCredentials(snapshot.credentials))
+        self._configs[config] = (snapshot, parsed)
+        return parsed
@@ -0,0 +1,117 @@
+# test_django_secrets.py
+"""Drive SecretsConnectionMiddleware through django.test.Client on sqlite3.
+
+The database file name is a secret (``SQLITE_NAME``); rotating it must point
+the next request at the new database without restarting anything.
+"""
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+if not settings.configured:
+    settings.configure(
+        DEBUG=False,
+        ALLOWED_HOSTS=['testserver'],
+        ROOT_URLCONF=__name__,
+        MIDDLEWARE=['django_secrets.SecretsConnectionMiddleware'],
+        INSTALLED_APPS=[],
+        DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}},
+        SECRETS_DATABASES={'default': {'NAME': 'SQLITE_NAME'}},
+    )
+    django.setup()
+
+from django.db import connection  # noqa: E402
+from django.http import HttpResponse  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.urls import path  # noqa: E402
+
+import django_secrets  # noqa: E402
+from secrets_loader import SecretsLoader  # noqa: E402
+
+
+def database_name(request):
+    with connection.cursor() as cursor:
+        cursor.execute('CREATE TABLE IF NOT EXISTS seen (id INTEGER)')
+    return HttpResponse(connection.settings_dict['NAME'])
+
+
+urlpatterns = [path('name', database_name)]
+
+
+class SecretsConnectionMiddlewareTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix='django-secrets-')
+        self.secrets_dir = os.path.join(self.root, 'secrets')
+        os.mkdir(self.secrets_dir)
+        self.client = Client()
+
+    def tearDown(self):
+        django_secrets.set_loader(None)
+        connection.close()
+        shutil.rmtree(self.root)
+
+    def write_secret(self, secrets_dir, database):
+        name = os.path.join(self.root, database)
+        with open(os.path.join(secrets_dir, 'SQLITE_NAME'), 'w') as file:
+            file.write(name + '\n')
+        return name
+
+    def test_rotation_switches_database(self):
+        first = self.write_secret(self.secrets_dir, 'first.sqlite3')
+        loader = SecretsLoader([self.secrets_dir], incremental=True)
+        django_secrets.set_loader(loader)
+
+        response = self.client.get('/name')
+        self.assertEqual(response.content.decode(), first)
+        self.assertTrue(os.path.exists(first))
+
+        second = self.write_secret(self.secrets_dir, 'second.sqlite3')
+        self.assertIn('SQLITE_NAME', loader.load_secrets().changed)
+
+        response = self.client.get('/name')
+        self.assertEqual(response.content.decode(), second)
+        self.assertTrue(os.path.exists(second))
+
+    def test_unchanged_version_keeps_connection(self):
+        self.write_secret(self.secrets_dir, 'steady.sqlite3')
+        django_secrets.set_loader(SecretsLoader([self.secrets_dir], incremental=True))
+
+        self.client.get('/name')
+        opened = connection.connection
+        self.assertEqual(self.client.get('/name').status_code, 200)
+        self.assertIs(connection.connection, opened)
+
+    def test_set_loader_from_another_thread(self):
+        self.write_secret(self.secrets_dir, 'old.sqlite3')
+        old_loader = SecretsLoader([self.secrets_dir], incremental=True)
+        django_secrets.set_loader(old_loader)
+        self.client.get('/name')
+
+        other_dir = os.path.join(self.root, 'other')
+        os.mkdir(other_dir)
+        new = self.write_secret(other_dir, 'new.sqlite3')
+        new_loader = SecretsLoader([other_dir], incremental=True)
+        # Same snapshot version, different loader; the loader generation,
+        # not id(), tells them apart even if the address is reused
+        self.assertEqual(new_loader.version, old_loader.version)
+        generation = django_secrets._loader_generation
+        thread = threading.Thread(target=django_secrets.set_loader, args=(new_loader,))
+        thread.start()
+        thread.join()
+        self.assertEqual(django_secrets._loader_generation, generation + 1)
+
+        response = self.client.get('/name')
+        self.assertEqual(response.content.decode(), new)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+# test_inotify_watcher.py
+"""Drive InotifyWatcher with real file operations in a temporary directory."""
+import os
+import sys
+import queue
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inotify_watcher import (IN_CLOSE_WRITE, IN_DELETE, IN_MOVED_FROM, IN_MOVED_TO,  # noqa: E402
+                             InotifyWatcher, inotify_available)
+
+
+@unittest.skipUnless(inotify_available(), "inotify is only available on Linux")
+class InotifyWatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp(prefix='inotify-')
+        self.batches = queue.Queue()
+        self.watcher = InotifyWatcher([self.dir], self.batches.put)
+        self.watcher.start()
+
+    def tearDown(self):
+        self.watcher.stop()
+        self.watcher.join(5)
+        shutil.rmtree(self.dir)
+
+    def events(self, count):
+        """Collect batches until ``count`` events arrived; return (batches, events)."""
+        batches, events = [], []
+        while len(events) < count:
+            batch = self.batches.get(timeout=5)
+            self.assertIsInstance(batch, list)
+            batches.append(batch)
+            events.extend(batch)
+        return batches, events
+
+    def write(self, name, value):
+        with open(os.path.join(self.dir, name), 'w') as file:
+            file.write(value)
+
+    def test_write_rename_delete(self):
+        self.write('MYSQL_PASSWORD.tmp', 'secret')
+        os.rename(os.path.join(self.dir, 'MYSQL_PASSWORD.tmp'), os.path.join(self.dir, 'MYSQL_PASSWORD'))
+        os.unlink(os.path.join(self.dir, 'MYSQL_PASSWORD'))
+
+        _, events = self.events(4)
+        self.assertEqual([(event.mask & (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE), event.name)
+                          for event in events],
+                         [(IN_CLOSE_WRITE, 'MYSQL_PASSWORD.tmp'),
+                          (IN_MOVED_FROM, 'MYSQL_PASSWORD.tmp'),
+                          (IN_MOVED_TO, 'MYSQL_PASSWORD'),
+                          (IN_DELETE, 'MYSQL_PASSWORD')])
+        for event in events:
+            self.assertEqual(event.dir_path, self.dir)
+            self.assertFalse(event.is_directory)
+            self.assertFalse(event.is_overflow)
+        self.assertEqual(events[-1].src_path, os.path.join(self.dir, 'MYSQL_PASSWORD'))
+
+    def test_events_of_one_read_arrive_as_one_batch(self):
+        # Pause the reader so the kernel queues every event before the next read()
+        self.watcher.stop()
+        self.watcher.join(5)
+        self.watcher = InotifyWatcher([self.dir], self.batches.put)
+        for i in range(5):
+            self.write(f'KEY_{i}', str(i))
+        self.watcher.start()
+
+        batches, events = self.events(5)
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(sorted(event.name for event in events), [f'KEY_{i}' for i in range(5)])
+
+    def test_kubelet_swap_reports_only_data_link(self):
+        generation = os.path.join(self.dir, '..2024_01_01')
+        os.mkdir(generation)
+        with open(os.path.join(generation, 'API_TOKEN'), 'w') as file:
+            file.write('token')
+        os.symlink('..2024_01_01', os.path.join(self.dir, '..data_tmp'))
+        os.rename(os.path.join(self.dir, '..data_tmp'), os.path.join(self.dir, '..data'))
+
+        _, events = self.events(1)
+        self.assertEqual([(event.mask & IN_MOVED_TO, event.name) for event in events], [(IN_MOVED_TO, '..data')])
+
+
+
+@unittest.skipUnless(inotify_available(), "inotify is only available on Linux")
+class InotifyWatcherSetupTest(unittest.TestCase):
+
+    def test_missing_directory_closes_descriptors(self):
+        before = set(os.listdir('/proc/self/fd'))
+        with self.assertRaises(OSError):
+            InotifyWatcher([tempfile.gettempdir(), '/nonexistent/secrets'], lambda events: None)
+        self.assertEqual(set(os.listdir('/proc/self/fd')), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
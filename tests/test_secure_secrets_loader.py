@@ -0,0 +1,95 @@
+# test_secure_secrets_loader.py
+"""SecureSecretsLoader on a thread pool with a read that times out."""
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from secrets_schema import MySQLConfig, SecretsConfigError  # noqa: E402
+from secure_secrets_loader import SecureSecretsLoader  # noqa: E402
+
+
+class SlowSecureSecretsLoader(SecureSecretsLoader):
+    """Blocks reads of ``slow_key`` until ``release`` is set."""
+
+    slow_key = None
+
+    def __init__(self, *args, **options):
+        self.release = threading.Event()
+        super().__init__(*args, **options)
+
+    def _load_path(self, secret_path):
+        if self.slow_key is not None and secret_path.endswith(self.slow_key):
+            self.release.wait(10)
+        return super()._load_path(secret_path)
+
+
+class ReadTimeoutTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp(prefix='secure-secrets-')
+        for key, value in (('MYSQL_PASSWORD', 'hunter2'), ('API_TOKEN', 'token')):
+            with open(os.path.join(self.dir, key), 'w') as file:
+                file.write(value + '\n')
+        self.loader = SlowSecureSecretsLoader([self.dir], incremental=True, max_workers=2, read_timeout=0.2)
+
+    def tearDown(self):
+        self.loader.release.set()
+        self.loader.close()
+        shutil.rmtree(self.dir)
+
+    def test_timeout_neither_deadlocks_nor_wipes_live_values(self):
+        self.loader.slow_key = 'MYSQL_PASSWORD'
+        with open(os.path.join(self.dir, 'MYSQL_PASSWORD'), 'w') as file:
+            file.write('rotated\n')
+
+        reload = threading.Thread(target=self.loader.load_secrets, daemon=True)
+        reload.start()
+        reload.join(5)
+        self.assertFalse(reload.is_alive(), "load_secrets() did not return after a read timeout")
+
+        # The slow file keeps its last value, and nothing in use was wiped
+        self.assertEqual(self.loader.get_credential('MYSQL_PASSWORD'), 'hunter2')
+        self.assertEqual(self.loader.get_credential('API_TOKEN'), 'token')
+
+        self.loader.slow_key = None
+        self.assertEqual(self.loader.load_secrets().changed, {'MYSQL_PASSWORD'})
+        self.assertEqual(self.loader.get_credential('MYSQL_PASSWORD'), 'rotated')
+
+    def test_close_wipes_values(self):
+        with self.loader.secret('MYSQL_PASSWORD') as view:
+            self.assertEqual(bytes(view), b'hunter2')
+        value = self.loader.get_snapshot().credentials['MYSQL_PASSWORD']
+        self.loader.close()
+        self.assertEqual(repr(value), '<SecureValue, wiped>')
+
+
+class BinaryValueTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp(prefix='secure-secrets-')
+        for key in ('MYSQL_HOSTNAME', 'MYSQL_USERNAME', 'MYSQL_DB'):
+            with open(os.path.join(self.dir, key), 'w') as file:
+                file.write('db\n')
+        with open(os.path.join(self.dir, 'MYSQL_PASSWORD'), 'wb') as file:
+            file.write(b'hun\xffter2')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_binary_value_is_an_invalid_key(self):
+        loader = SecureSecretsLoader([self.dir], schemas=[MySQLConfig])
+        self.assertIsNone(loader.get_credential('MYSQL_PASSWORD'))
+        with self.assertRaises(SecretsConfigError) as raised:
+            loader.get_config(MySQLConfig)
+        self.assertIn('MYSQL_PASSWORD', raised.exception.invalid)
+        self.assertNotIn('0xff', str(raised.exception))
+        loader.close()
+
+
+if __name__ == '__main__':
+    unittest.main()